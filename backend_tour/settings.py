@@ -62,6 +62,7 @@ REST_FRAMEWORK = {
     "rest_framework.filters.SearchFilter",
     "rest_framework.filters.OrderingFilter",
   ),
+  "DEFAULT_PAGINATION_CLASS": "turismo.pagination.KeysetPagination",
 }
 
 CORS_ALLOW_HEADERS = list(default_headers) + [
@@ -69,22 +70,125 @@ CORS_ALLOW_HEADERS = list(default_headers) + [
 ]
 
 MIDDLEWARE = [
+    'turismo.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'turismo.profiling.ProfilingMiddleware',
+    'turismo.slowqueries.SlowQueryMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'backend_tour.urls'
 
+# ============================
+# CACHÉ
+# ============================
+# En producción con varios workers usar una caché compartida (Redis/Memcached),
+# p. ej. "django.core.cache.backends.redis.RedisCache"; LocMem es por proceso.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "dorado-travel",
+    }
+}
+
+# Segundos que vive una respuesta cacheada del contenido público.
+RESPONSE_CACHE_TIMEOUT = 60 * 15
+
+# ============================
+# TRACKING DE VISITAS
+# ============================
+# POLICY: "drop" descarta si la cola está llena; "block" espera BLOCK_TIMEOUT segundos.
+PAGEVIEW_BUFFER = {
+    "ENABLED": True,
+    "MAX_SIZE": 10000,
+    "BATCH_SIZE": 500,
+    "FLUSH_INTERVAL": 2.0,
+    "POLICY": "drop",
+    "BLOCK_TIMEOUT": 0.05,
+}
+
+# ============================
+# VARIANTES DE IMÁGENES
+# ============================
+# PROCESSES: procesos de Pillow por worker web; THREADS: hilos que guardan los resultados.
+# SYNC=True genera al confirmar la transacción en el mismo hilo (útil en scripts).
+IMAGE_DERIVATIVES = {
+    "ENABLED": True,
+    "SYNC": False,
+    "PROCESSES": 2,
+    "THREADS": 2,
+    "QUALITY": 82,
+}
+
+# ============================
+# MÉTRICAS (/metrics)
+# ============================
+# MULTIPROCESS_DIR: directorio compartido por los workers (gunicorn) para sumar sus
+# métricas; vaciarlo en cada despliegue. SCRAPE_TOKEN: valor del encabezado
+# X-Metrics-Token para Prometheus (sin token solo entran administradores con JWT).
+METRICS = {
+    "ENABLED": True,
+    "MULTIPROCESS_DIR": None,
+    "FLUSH_INTERVAL": 5.0,
+    "SCRAPE_TOKEN": None,
+}
+
+# ============================
+# PERFILADO BAJO DEMANDA
+# ============================
+# Admin + encabezado "X-Profile: 1" perfila esa petición; SAMPLE_RATE (0..1) perfila
+# una fracción de todo el tráfico. Se ven en el admin (Perfiles de peticiones).
+PROFILING = {
+    "ENABLED": True,
+    "SAMPLE_RATE": 0.0,
+    "MAX_PROFILES": 200,
+    "TOP_FUNCTIONS": 40,
+}
+
+# ============================
+# CONSULTAS LENTAS
+# ============================
+# Consultas de más de THRESHOLD_MS se agrupan por huella con su p95, vista y EXPLAIN
+# (admin: Consultas lentas, ordenadas por tiempo total).
+SLOW_QUERIES = {
+    "ENABLED": True,
+    "THRESHOLD_MS": 100,
+    "FLUSH_INTERVAL": 30.0,
+    "SAMPLE_SIZE": 200,
+    "EXPLAIN_SAMPLE_RATE": 0.1,
+}
+
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Servido de media (turismo/media.py). En producción con nginx:
+#   "ACCEL": "nginx" y una location internal, p. ej.
+#   location /protected-media/ { internal; alias /ruta/a/media/; }
+# Con Apache/lighttpd: "ACCEL": "sendfile". Sin ACCEL los sirve Django.
+MEDIA_SERVING = {
+    "ACCEL": None,
+    "ACCEL_PREFIX": "/protected-media/",
+    "IMMUTABLE_MAX_AGE": 60 * 60 * 24 * 365,
+    "MAX_AGE": 60 * 60,
+}
+
+# Archivos subidos: un blob por contenido (sha256), ver turismo/storage.py.
+STORAGES = {
+    "default": {
+        "BACKEND": "turismo.storage.ContentAddressedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
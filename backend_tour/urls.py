@@ -1,13 +1,15 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
 
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
 
+from turismo.media import serve_media
+from turismo.metrics import metrics_view
+
 urlpatterns = [
     # Admin Django
     path("admin/", admin.site.urls),
@@ -18,8 +20,13 @@ urlpatterns = [
     # JWT
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+
+    # Métricas Prometheus (solo admin o scraper con token)
+    path("metrics", metrics_view, name="metrics"),
 ]
 
-# Archivos multimedia (solo en desarrollo)
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Archivos multimedia: Django valida y pone los encabezados; con MEDIA_SERVING["ACCEL"]
+# los bytes los entrega el servidor web (ver turismo/media.py).
+urlpatterns += [
+    re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.+)$", serve_media, name="media"),
+]
@@ -1,10 +1,19 @@
+import json
+
+from django import forms
 from django.contrib import admin
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.html import format_html
+
+from .availability import ACTIVE_STATUSES, release_reservations, release_seats, remaining_seats, reserve_seats
 from .models import (
     SiteInfo, HeroSlide, Service, AboutBlock, ValueItem, TeamMember,
     Certification, KPI, Faq, Testimonial, Category,
     Package, PackagePhoto, PackageInclude, PackageItinerary,
     Reservation, ContactMessage, NewsletterSubscriber, PageView,
-    Cart, CartItem, Payment
+    Cart, CartItem, Payment, PageViewDaily, PageViewMonthly, PackageDateCapacity,
+    RequestProfile, SlowQuery,
 )
 
 @admin.register(SiteInfo, HeroSlide, Service, AboutBlock, ValueItem, TeamMember, Certification, KPI, Faq, Testimonial, Category)
@@ -37,12 +46,55 @@ class PackageAdmin(admin.ModelAdmin):
     inlines = [PackagePhotoInline, PackageIncludeInline, PackageItineraryInline]
 
 
+class ReservationAdminForm(forms.ModelForm):
+    class Meta:
+        model = Reservation
+        fields = "__all__"
+
+    def clean(self):
+        # Aviso temprano; el UPDATE condicional de save_model es el que garantiza el cupo.
+        cleaned = super().clean()
+        package, travel_date = cleaned.get("package"), cleaned.get("travel_date")
+        seats = (cleaned.get("adults") or 0) + (cleaned.get("children") or 0)
+        if package is None or cleaned.get("status") not in ACTIVE_STATUSES or seats <= 0:
+            return cleaned
+        previous = None
+        if self.instance.pk:
+            previous = Reservation.objects.filter(pk=self.instance.pk).first()
+        remaining = remaining_seats(package, travel_date, exclude=previous)
+        if remaining is not None and seats > remaining:
+            raise forms.ValidationError(
+                f"No hay cupos suficientes para esa fecha (quedan {remaining}, se piden {seats})."
+            )
+        return cleaned
+
+
 @admin.register(Reservation)
 class ReservationAdmin(admin.ModelAdmin):
+    # Las ediciones desde el admin mueven el libro de cupos igual que la API.
+    form = ReservationAdminForm
     list_display = ("id", "package", "full_name", "email", "phone", "nationality", "status", "total_amount", "currency", "public_code", "created_at")
     list_filter = ("status", "currency")
     search_fields = ("full_name", "email", "phone", "public_code", "package__title")
 
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            if change:
+                release_seats([Reservation.objects.select_for_update().get(pk=obj.pk)])
+            super().save_model(request, obj, form, change)
+            reserve_seats([obj])
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            release_seats([Reservation.objects.select_for_update().get(pk=obj.pk)])
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            ids = list(queryset.select_for_update().values_list("pk", flat=True))
+            release_reservations(Reservation.objects.filter(pk__in=ids))
+            super().delete_queryset(request, queryset)
+
 
 @admin.register(ContactMessage)
 class ContactAdmin(admin.ModelAdmin):
@@ -62,6 +114,29 @@ class PageViewAdmin(admin.ModelAdmin):
     search_fields = ("path", "ip", "country")
 
 
+@admin.register(PageViewDaily)
+class PageViewDailyAdmin(admin.ModelAdmin):
+    list_display = ("date", "path", "total")
+    list_filter = ("date",)
+    search_fields = ("path",)
+
+
+@admin.register(PageViewMonthly)
+class PageViewMonthlyAdmin(admin.ModelAdmin):
+    list_display = ("year", "month", "path", "total")
+    list_filter = ("year", "month")
+    search_fields = ("path",)
+
+
+@admin.register(PackageDateCapacity)
+class PackageDateCapacityAdmin(admin.ModelAdmin):
+    # Lo mantienen las reservas; se corrige con manage.py rebuild_capacity_ledger.
+    list_display = ("package", "date", "reserved", "updated_at")
+    list_filter = ("date",)
+    search_fields = ("package__title",)
+    readonly_fields = ("package", "date", "reserved", "updated_at")
+
+
 class CartItemInline(admin.TabularInline):
     model = CartItem
     extra = 0
@@ -92,3 +167,77 @@ class CartItemAdmin(admin.ModelAdmin):
     list_filter = ("currency",)
     search_fields = ("cart__email", "package__title", "reservation__public_code")
     readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    # Los crea turismo.profiling (X-Profile: 1 o muestreo); solo lectura.
+    list_display = ("id", "created_at", "method", "path", "view", "status_code", "duration_ms", "sql_count", "sql_ms", "trigger", "user")
+    list_filter = ("trigger", "method", "status_code")
+    search_fields = ("path", "view", "query_string")
+    exclude = ("summary", "sql_trace", "raw_stats")
+    readonly_fields = (
+        "created_at", "method", "path", "query_string", "view", "status_code", "duration_ms",
+        "sql_count", "sql_ms", "trigger", "user", "summary_display", "sql_trace_display",
+    )
+    actions = ["download_stats"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Resumen del perfil")
+    def summary_display(self, obj):
+        return format_html("<pre>{}</pre>", obj.summary)
+
+    @admin.display(description="Traza SQL")
+    def sql_trace_display(self, obj):
+        return format_html("<pre>{}</pre>", json.dumps(obj.sql_trace, indent=2, ensure_ascii=False))
+
+    @admin.action(description="Descargar .prof (snakeviz / pstats)")
+    def download_stats(self, request, queryset):
+        profile = queryset.exclude(raw_stats=None).first()
+        if profile is None:
+            self.message_user(request, "El perfil no tiene estadísticas guardadas.")
+            return None
+        response = HttpResponse(bytes(profile.raw_stats), content_type="application/octet-stream")
+        response["Content-Disposition"] = f'attachment; filename="perfil-{profile.pk}.prof"'
+        return response
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    # Peores primero (tiempo total acumulado); borrar filas reinicia su conteo.
+    list_display = ("fingerprint", "short_sql", "count", "avg_display", "p95_ms", "max_ms", "total_ms", "last_view", "last_seen")
+    search_fields = ("sql", "last_view", "fingerprint")
+    ordering = ("-total_ms",)
+    exclude = ("samples", "views", "explain")
+    readonly_fields = (
+        "fingerprint", "sql", "count", "total_ms", "max_ms", "p95_ms", "last_view", "last_seen",
+        "views_display", "explain_display", "explained_at", "created_at",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="SQL")
+    def short_sql(self, obj):
+        return obj.sql if len(obj.sql) <= 120 else obj.sql[:117] + "..."
+
+    @admin.display(description="Promedio (ms)", ordering="total_ms")
+    def avg_display(self, obj):
+        return round(obj.avg_ms, 1)
+
+    @admin.display(description="Ejecuciones por vista")
+    def views_display(self, obj):
+        ranked = sorted(obj.views.items(), key=lambda item: -item[1])
+        return format_html("<pre>{}</pre>", "\n".join(f"{count:>8}  {view or '(fuera de una vista)'}" for view, count in ranked))
+
+    @admin.display(description="Plan (EXPLAIN)")
+    def explain_display(self, obj):
+        return format_html("<pre>{}</pre>", obj.explain)
@@ -0,0 +1,283 @@
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from rest_framework import serializers, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.response import Response
+
+from .models import PackageDateCapacity, Reservation
+
+
+# ======================================================
+# CUPOS POR PAQUETE Y FECHA
+# ======================================================
+# PackageDateCapacity.reserved lleva los asientos (adultos + niños) de las
+# reservas activas. Reservar es un UPDATE condicional
+# "reserved <= max_group - asientos": si otra transacción llenó la fecha
+# primero, el UPDATE no toca filas y se responde 409 sin sobrevender.
+# Las funciones de escritura deben llamarse dentro de transaction.atomic().
+ACTIVE_STATUSES = ("PENDIENTE", "CONTACTADO", "CONFIRMADO")
+SEATS = F("adults") + F("children")
+
+
+class SeatsUnavailable(Exception):
+    def __init__(self, package, travel_date, requested, remaining):
+        super().__init__(f"Sin cupos para {package} el {travel_date}")
+        self.data = {
+            "detail": "No hay cupos suficientes para esa fecha",
+            "package_id": package.id,
+            "travel_date": travel_date.isoformat(),
+            "requested": requested,
+            "remaining": remaining,
+        }
+
+
+class SeatsUnavailableMixin:
+    # Convierte SeatsUnavailable en 409 después de que la transacción se revirtió.
+    def handle_exception(self, exc):
+        if isinstance(exc, SeatsUnavailable):
+            return Response(exc.data, status=status.HTTP_409_CONFLICT)
+        return super().handle_exception(exc)
+
+
+def _seat_totals(reservations):
+    totals, holders = defaultdict(int), {}
+    for reservation in reservations:
+        seats = (reservation.adults or 0) + (reservation.children or 0)
+        if reservation.travel_date is None or reservation.status not in ACTIVE_STATUSES or seats <= 0:
+            continue
+        totals[(reservation.package_id, reservation.travel_date)] += seats
+        holders[reservation.package_id] = reservation
+    return totals, holders
+
+
+def reserve_seats(reservations):
+    totals, holders = _seat_totals(reservations)
+    if not totals:
+        return
+
+    existing = set(
+        PackageDateCapacity.objects
+        .filter(package_id__in={p for p, _ in totals}, date__in={d for _, d in totals})
+        .values_list("package_id", "date")
+    )
+    PackageDateCapacity.objects.bulk_create(
+        [PackageDateCapacity(package_id=p, date=d) for p, d in totals if (p, d) not in existing],
+        ignore_conflicts=True,
+    )
+
+    # Orden fijo de filas para que dos checkouts concurrentes no se bloqueen mutuamente.
+    for package_id, travel_date in sorted(totals):
+        package, seats = holders[package_id].package, totals[(package_id, travel_date)]
+        rows = PackageDateCapacity.objects.filter(package_id=package_id, date=travel_date)
+        if package.max_group is None:
+            rows.update(reserved=F("reserved") + seats)
+            continue
+        if seats <= package.max_group and rows.filter(reserved__lte=package.max_group - seats).update(
+            reserved=F("reserved") + seats
+        ):
+            continue
+        reserved = rows.values_list("reserved", flat=True).first() or 0
+        raise SeatsUnavailable(package, travel_date, seats, max(package.max_group - reserved, 0))
+
+
+def _release(totals):
+    for (package_id, travel_date), seats in sorted(totals.items()):
+        PackageDateCapacity.objects.filter(package_id=package_id, date=travel_date).update(
+            reserved=Case(
+                When(reserved__gte=seats, then=F("reserved") - seats),
+                default=Value(0),
+            )
+        )
+
+
+def release_seats(reservations):
+    totals, _ = _seat_totals(reservations)
+    _release(totals)
+
+
+def remaining_seats(package, travel_date, exclude=None):
+    # Lectura sin bloqueo (formularios): los asientos de `exclude` cuentan como libres.
+    if package.max_group is None or travel_date is None:
+        return None
+    reserved = (
+        PackageDateCapacity.objects
+        .filter(package=package, date=travel_date)
+        .values_list("reserved", flat=True)
+        .first()
+    ) or 0
+    if exclude is not None:
+        reserved -= _seat_totals([exclude])[0].get((package.id, travel_date), 0)
+    return max(package.max_group - reserved, 0)
+
+
+def release_reservations(queryset):
+    # Versión por conjunto: una consulta agregada y un UPDATE por paquete/fecha.
+    rows = (
+        queryset
+        .filter(status__in=ACTIVE_STATUSES, travel_date__isnull=False)
+        .values("package_id", "travel_date")
+        .annotate(seats=Sum(SEATS))
+        .order_by()
+    )
+    _release({(row["package_id"], row["travel_date"]): row["seats"] for row in rows if row["seats"]})
+
+
+# ======================================================
+# CONSULTA MENSUAL
+# ======================================================
+def month_availability(package, year, month):
+    first = date(year, month, 1)
+    days = calendar.monthrange(year, month)[1]
+    reserved = dict(
+        PackageDateCapacity.objects
+        .filter(package=package, date__gte=first, date__lte=first.replace(day=days))
+        .values_list("date", "reserved")
+    )
+
+    today = timezone.localdate()
+    result = []
+    for offset in range(days):
+        day = first + timedelta(days=offset)
+        taken = reserved.get(day, 0)
+        remaining = None if package.max_group is None else max(package.max_group - taken, 0)
+        result.append({
+            "date": day.isoformat(),
+            "reserved": taken,
+            "remaining": remaining,
+            "available": day >= today and remaining != 0,
+        })
+    return result
+
+
+# ======================================================
+# FILTRO POR VENTANA DE FECHAS Y TAMAÑO DE GRUPO
+# ======================================================
+# Un paquete entra si al menos un día de la ventana tiene cupo para el grupo.
+# Se cuentan en SQL los días "llenos" (reserved + grupo > max_group) dentro de
+# la ventana; los días sin fila en el libro están libres, así que basta con
+# que haya menos días llenos que días en la ventana.
+MAX_WINDOW_DAYS = 366
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    party_size = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        start, end = attrs.get("date_from"), attrs.get("date_to")
+        if start and end and end < start:
+            raise ValidationError({"to": "Debe ser igual o posterior a from"})
+        if start and end and (end - start).days >= MAX_WINDOW_DAYS:
+            raise ValidationError({"to": f"La ventana no puede superar {MAX_WINDOW_DAYS} días"})
+        return attrs
+
+
+class PackageAvailabilityFilter(BaseFilterBackend):
+    params = ("from", "to", "party_size")
+
+    def is_active(self, request):
+        return any(request.query_params.get(name) for name in self.params)
+
+    def get_window(self, request):
+        params = request.query_params
+        serializer = AvailabilityQuerySerializer(data={
+            key: params[name]
+            for name, key in (("from", "date_from"), ("to", "date_to"), ("party_size", "party_size"))
+            if params.get(name)
+        })
+        if not serializer.is_valid():
+            errors = serializer.errors
+            for name, key in (("from", "date_from"), ("to", "date_to")):
+                if key in errors:
+                    errors[name] = errors.pop(key)
+            raise ValidationError(errors)
+
+        data = serializer.validated_data
+        today = timezone.localdate()
+        start = data.get("date_from") or today
+        end = data.get("date_to") or start
+        return max(start, today), end, data.get("party_size", 1)
+
+    def filter_queryset(self, request, queryset, view):
+        if not self.is_active(request):
+            return queryset
+
+        start, end, party_size = self.get_window(request)
+        if end < start:
+            # Ventana completamente en el pasado.
+            return queryset.none()
+
+        full_days = (
+            PackageDateCapacity.objects
+            .filter(package=OuterRef("pk"), date__gte=start, date__lte=end)
+            .alias(after=F("reserved") + party_size)
+            .filter(after__gt=OuterRef("max_group"))
+            .order_by()
+            .values("package")
+            .annotate(days=Count("id"))
+            .values("days")
+        )
+        window_days = (end - start).days + 1
+        return (
+            queryset
+            .alias(full_days=Coalesce(Subquery(full_days, output_field=IntegerField()), 0))
+            .filter(
+                Q(max_group__isnull=True)
+                | Q(max_group__gte=party_size, full_days__lt=window_days)
+            )
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": "from",
+                "required": False,
+                "in": "query",
+                "description": "Inicio de la ventana de viaje (YYYY-MM-DD)",
+                "schema": {"type": "string", "format": "date"},
+            },
+            {
+                "name": "to",
+                "required": False,
+                "in": "query",
+                "description": "Fin de la ventana de viaje (YYYY-MM-DD)",
+                "schema": {"type": "string", "format": "date"},
+            },
+            {
+                "name": "party_size",
+                "required": False,
+                "in": "query",
+                "description": "Personas que viajan juntas",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+# ======================================================
+# RECONSTRUCCIÓN DEL LIBRO DE CUPOS
+# ======================================================
+def rebuild_capacity_ledger(batch_size=1000):
+    with transaction.atomic():
+        rows = (
+            Reservation.objects
+            .filter(status__in=ACTIVE_STATUSES, travel_date__isnull=False)
+            .values("package_id", "travel_date")
+            .annotate(seats=Sum(SEATS))
+            .order_by()
+        )
+        ledger = [
+            PackageDateCapacity(package_id=row["package_id"], date=row["travel_date"], reserved=row["seats"])
+            for row in rows if row["seats"]
+        ]
+        PackageDateCapacity.objects.all().delete()
+        PackageDateCapacity.objects.bulk_create(ledger, batch_size=batch_size)
+    return len(ledger)
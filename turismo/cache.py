@@ -0,0 +1,163 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+# ======================================================
+# VERSIONES POR MODELO
+# ======================================================
+# Cada modelo tiene un contador de versión en la caché; guardar o borrar una
+# fila lo incrementa al confirmarse la transacción (ver signals.py) y todas
+# las respuestas cacheadas con la versión anterior dejan de usarse sin tener
+# que buscarlas ni borrarlas.
+# Junto a la versión se guarda el momento del último cambio (Last-Modified).
+VERSION_KEY = "turismo:version:{label}"
+MODIFIED_KEY = "turismo:modified:{label}"
+
+
+def _version_key(model):
+    return VERSION_KEY.format(label=model._meta.label_lower)
+
+
+def _modified_key(model):
+    return MODIFIED_KEY.format(label=model._meta.label_lower)
+
+
+def _initial_version():
+    # Si la clave se pierde (reinicio, desalojo) no se reutiliza un número viejo.
+    return int(time.time() * 1000)
+
+
+def get_versions(models):
+    keys = [_version_key(m) for m in models]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        if key not in found:
+            cache.add(key, _initial_version(), timeout=None)
+            found[key] = cache.get(key)
+        versions.append(found[key])
+    return versions
+
+
+def get_last_modified(models):
+    keys = [_modified_key(m) for m in models]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Sin registro del último cambio se toma "ahora": nunca se responde 304 de más.
+            cache.add(key, int(time.time()), timeout=None)
+            found[key] = cache.get(key)
+    return max(found.values()) if found else None
+
+
+def bump_version(model):
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), timeout=None)
+    cache.set(_modified_key(model), int(time.time()), timeout=None)
+
+
+# ======================================================
+# CACHÉ DE RESPUESTAS
+# ======================================================
+def response_cache_key(request, namespace, models):
+    versions = ".".join(str(v) for v in get_versions(models))
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f"turismo:response:{namespace}:{versions}:{url}"
+
+
+def get_cached_response(key):
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    content, content_type = cached
+    return HttpResponse(content, content_type=content_type)
+
+
+def cache_response(key, request, data, renderer_context=None):
+    # Se guarda el JSON ya renderizado: un acierto no toca ORM, serializers ni renderer.
+    renderer = request.accepted_renderer
+    content = renderer.render(data, request.accepted_media_type, renderer_context or {})
+    content_type = request.accepted_media_type
+    if renderer.charset:
+        content_type = f"{content_type}; charset={renderer.charset}"
+    cache.set(key, (content, content_type), settings.RESPONSE_CACHE_TIMEOUT)
+    return HttpResponse(content, content_type=content_type)
+
+
+# ======================================================
+# GET CONDICIONAL (ETag / Last-Modified)
+# ======================================================
+# El ETag sale de la clave de caché (versiones de los modelos + URL), así que
+# se calcula sin tocar la base ni serializar: si coincide se responde 304.
+def response_validators(key, models):
+    return f'"{hashlib.md5(key.encode()).hexdigest()}"', get_last_modified(models)
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    # El cliente puede guardar la respuesta pero debe revalidarla en cada uso.
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+def not_modified_response(request, etag, last_modified):
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def is_cacheable_request(request):
+    return request.method == "GET" and request.accepted_renderer.format == "json"
+
+
+class VersionedCacheMixin:
+    # Modelos de los que depende la respuesta; por defecto el del queryset.
+    cache_models = ()
+    cached_actions = ("list", "retrieve")
+
+    def get_cache_models(self):
+        return self.cache_models or (self.queryset.model,)
+
+    def should_cache_response(self, request):
+        return self.action in self.cached_actions and is_cacheable_request(request)
+
+    def get_response_cache_key(self, request):
+        return response_cache_key(request, f"{self.basename}:{self.action}", self.get_cache_models())
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not self.should_cache_response(request):
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        etag, last_modified = response_validators(key, self.get_cache_models())
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        cached = get_cached_response(key)
+        if cached is not None:
+            return set_validators(cached, etag, last_modified)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response = cache_response(key, request, response.data, self.get_renderer_context())
+            return set_validators(response, etag, last_modified)
+        return response
@@ -0,0 +1,199 @@
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+
+from .cache import bump_version
+from .image_ops import FORMATS, VARIANT_WIDTHS, render_variants
+from .models import AboutBlock, HeroSlide, Package, PackagePhoto, TeamMember
+from .storage import is_content_addressed
+
+logger = logging.getLogger(__name__)
+
+
+# ======================================================
+# PIPELINE DE VARIANTES DE IMÁGENES
+# ======================================================
+# Tras confirmar la transacción que subió la imagen, un hilo del proceso web
+# lee el original y lo manda a un pool de procesos (Pillow, ver image_ops).
+# Con los bytes de vuelta guarda las variantes en el storage del campo y
+# actualiza solo la columna *_variants con .update(); como eso no dispara
+# señales, sube a mano la versión de caché del modelo.
+# "source" guarda el nombre del original: si no coincide, hay que regenerar.
+DEFAULTS = {
+    "ENABLED": True,
+    "SYNC": False,
+    "PROCESSES": 2,
+    "THREADS": 2,
+    "QUALITY": 82,
+    "WIDTHS": VARIANT_WIDTHS,
+}
+
+# Modelo -> (campo de imagen, campo de variantes).
+IMAGE_FIELDS = {
+    Package: ("cover", "cover_variants"),
+    PackagePhoto: ("image", "image_variants"),
+    HeroSlide: ("image", "image_variants"),
+    TeamMember: ("avatar", "avatar_variants"),
+    AboutBlock: ("image", "image_variants"),
+}
+
+
+def is_stale(instance):
+    image_field, variants_field = IMAGE_FIELDS[type(instance)]
+    name = getattr(instance, image_field).name or ""
+    return name != ((getattr(instance, variants_field) or {}).get("source") or "")
+
+
+def _variant_paths(variants):
+    for entry in (variants or {}).values():
+        if isinstance(entry, dict):
+            for ext in FORMATS:
+                if entry.get(ext):
+                    yield entry[ext]
+
+
+class DerivativePipeline:
+    def __init__(self, options=None):
+        self.options = {**DEFAULTS, **(options or {})}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._processes = None
+        self._threads = None
+
+    def _ensure_pools(self):
+        # Los pools no sobreviven a un fork (gunicorn --preload): se recrean por proceso.
+        if self._pid == os.getpid() and self._processes is not None:
+            return
+        with self._lock:
+            if self._pid != os.getpid() or self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.options["PROCESSES"])
+                self._threads = ThreadPoolExecutor(
+                    max_workers=self.options["THREADS"], thread_name_prefix="image-variants"
+                )
+                self._pid = os.getpid()
+
+    def schedule(self, instance):
+        if not self.options["ENABLED"] or not is_stale(instance):
+            return
+        model, pk = type(instance), instance.pk
+        if self.options["SYNC"]:
+            transaction.on_commit(lambda: self._run(model, pk))
+            return
+        self._ensure_pools()
+        transaction.on_commit(lambda: self._threads.submit(self._run, model, pk))
+
+    def _run(self, model, pk, force=False):
+        close_old_connections()
+        try:
+            return self.generate(model, pk, force=force)
+        except Exception:
+            logger.exception("No se pudieron generar las variantes de %s #%s", model.__name__, pk)
+            return False
+        finally:
+            close_old_connections()
+
+    def generate(self, model, pk, force=False):
+        image_field, variants_field = IMAGE_FIELDS[model]
+        row = model.objects.filter(pk=pk).values(image_field, variants_field).first()
+        if row is None:
+            return False
+
+        name, previous = row[image_field] or "", row[variants_field] or {}
+        storage = model._meta.get_field(image_field).storage
+        if not name:
+            # Se quitó la imagen: se limpian las variantes viejas.
+            if previous and model.objects.filter(pk=pk, **{image_field: name}).update(**{variants_field: {}}):
+                bump_version(model)
+                self._delete_files(storage, previous)
+            return False
+        if not force and previous.get("source") == name:
+            return False
+
+        variants = None if force else self._shared_variants(name)
+        if variants is None:
+            variants = self._render(storage, name)
+
+        # Solo se escribe si el original no cambió mientras se procesaba.
+        if not model.objects.filter(pk=pk, **{image_field: name}).update(**{variants_field: variants}):
+            self._delete_files(storage, variants)
+            return False
+        bump_version(model)
+        self._delete_files(storage, previous)
+        return True
+
+    def _shared_variants(self, name):
+        # Con storage por contenido el mismo original puede estar en varias filas
+        # (misma foto en otro paquete o slide): se reutilizan sus variantes.
+        if not is_content_addressed(name):
+            return None
+        for model, (_, variants_field) in IMAGE_FIELDS.items():
+            variants = (
+                model.objects.filter(**{f"{variants_field}__source": name})
+                .values_list(variants_field, flat=True).first()
+            )
+            if variants:
+                return variants
+        return None
+
+    def _render(self, storage, name):
+        self._ensure_pools()
+        with storage.open(name, "rb") as fh:
+            source = fh.read()
+        rendered = self._processes.submit(
+            render_variants, source, self.options["WIDTHS"], self.options["QUALITY"]
+        ).result()
+
+        path = PurePosixPath(name)
+        base = f"{path.parent}/variants/{path.stem}"
+        variants = {"source": name}
+        for variant, entry in rendered.items():
+            variants[variant] = {"width": entry["width"], "height": entry["height"]}
+            for ext in FORMATS:
+                variants[variant][ext] = storage.save(f"{base}-{variant}.{ext}", ContentFile(entry[ext]))
+        return variants
+
+    def _delete_files(self, storage, variants):
+        for path in _variant_paths(variants):
+            try:
+                storage.delete(path)
+            except Exception:
+                logger.warning("No se pudo borrar la variante %s", path, exc_info=True)
+
+    def regenerate(self, models=None, force=False):
+        """Genera en paralelo las variantes pendientes (o todas con force). Devuelve (ok, fallidas)."""
+        jobs = []
+        for model in models or IMAGE_FIELDS:
+            image_field, variants_field = IMAGE_FIELDS[model]
+            for pk, name, variants in (
+                model.objects.exclude(**{image_field: ""}).exclude(**{f"{image_field}__isnull": True})
+                .values_list("pk", image_field, variants_field).iterator()
+            ):
+                if force or name != (variants or {}).get("source"):
+                    jobs.append((model, pk))
+
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=self.options["PROCESSES"]) as executor:
+            for ok in executor.map(lambda job: self._run(*job, force=force), jobs):
+                if ok:
+                    done += 1
+                else:
+                    failed += 1
+        return done, failed
+
+    def shutdown(self):
+        if self._pid != os.getpid() or self._processes is None:
+            return
+        # Lo que quede pendiente lo retoma manage.py build_image_variants.
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        self._processes.shutdown(wait=False, cancel_futures=True)
+
+
+image_pipeline = DerivativePipeline(getattr(settings, "IMAGE_DERIVATIVES", None))
+atexit.register(image_pipeline.shutdown)
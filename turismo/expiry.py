@@ -0,0 +1,43 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .availability import release_reservations
+from .models import Cart, Reservation
+
+
+# ======================================================
+# EXPIRACIÓN DE CARRITOS
+# ======================================================
+# Barre los carritos ABIERTO vencidos en lotes acotados (índice status, expires_at)
+# y cancela sus reservas PENDIENTE con UPDATE por conjunto, liberando sus cupos.
+DEFAULT_BATCH_SIZE = 500
+
+
+def expire_batch(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    now = now or timezone.now()
+    with transaction.atomic():
+        overdue = Cart.objects.filter(status="ABIERTO", expires_at__lt=now).order_by("expires_at")
+        if connection.features.has_select_for_update_skip_locked:
+            # Un carrito bloqueado por un checkout en curso se deja para la siguiente pasada.
+            overdue = overdue.select_for_update(skip_locked=True)
+        ids = list(overdue.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return 0
+
+        pending = Reservation.objects.filter(cart_item__cart_id__in=ids, status="PENDIENTE")
+        release_reservations(pending)
+        pending.update(status="CANCELADO", updated_at=now)
+        Cart.objects.filter(id__in=ids, status="ABIERTO").update(status="EXPIRADO", updated_at=now)
+    return len(ids)
+
+
+def expire_overdue_carts(batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    now = timezone.now()
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        expired = expire_batch(batch_size=batch_size, now=now)
+        if not expired:
+            break
+        total += expired
+        batches += 1
+    return total
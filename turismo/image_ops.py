@@ -0,0 +1,146 @@
+import io
+import math
+
+from PIL import Image, ImageOps
+
+
+# ======================================================
+# DERIVADAS DE IMÁGENES (SOLO PILLOW)
+# ======================================================
+# Este módulo no importa Django: se ejecuta dentro de los procesos del pool
+# (también con "spawn"/"forkserver"), recibe los bytes del original y devuelve
+# los bytes de cada variante. Guardar y actualizar filas lo hace el proceso web.
+VARIANT_WIDTHS = {"thumb": 320, "card": 800, "full": 1600}
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+
+def _flatten(image):
+    # JPEG no tiene canal alfa: las transparencias se componen sobre blanco.
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render_variants(source, widths=None, quality=82):
+    """Devuelve {variante: {"width", "height", "webp": bytes, "jpeg": bytes}}."""
+    widths = widths or VARIANT_WIDTHS
+    with Image.open(io.BytesIO(source)) as original:
+        # En JPEG decodifica directamente a una escala reducida (no baja de la variante mayor).
+        largest = max(widths.values())
+        original.draft("RGB", (largest, largest))
+        image = _flatten(ImageOps.exif_transpose(original))
+
+    result = {}
+    for name, width in sorted(widths.items(), key=lambda item: -item[1]):
+        # Nunca se agranda: si el original es más chico se usa su tamaño.
+        variant = image.copy()
+        variant.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        entry = {"width": variant.width, "height": variant.height}
+        for ext, pil_format in FORMATS.items():
+            buffer = io.BytesIO()
+            options = {"quality": quality}
+            if pil_format == "JPEG":
+                options.update(optimize=True, progressive=True)
+            else:
+                options.update(method=4)
+            variant.save(buffer, pil_format, **options)
+            entry[ext] = buffer.getvalue()
+        result[name] = entry
+        # La siguiente variante (más chica) parte de esta.
+        image = variant
+    return result
+
+
+# ======================================================
+# METADATOS Y PLACEHOLDER (BLURHASH)
+# ======================================================
+BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+SAMPLE_SIZE = 32
+_SRGB_TO_LINEAR = [
+    value / 12.92 if value <= 0.04045 else ((value + 0.055) / 1.055) ** 2.4
+    for value in (i / 255 for i in range(256))
+]
+
+
+def _base83(value, length):
+    return "".join(BASE83[(value // 83 ** (length - i - 1)) % 83] for i in range(length))
+
+
+def _linear_to_srgb(value):
+    value = max(0.0, min(1.0, value))
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value, exponent):
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def blurhash(image, x_components=4, y_components=3):
+    """Codifica una imagen RGB chica con el algoritmo de blurha.sh."""
+    width, height = image.size
+    pixels = [tuple(_SRGB_TO_LINEAR[c] for c in pixel) for pixel in image.getdata()]
+
+    factors = []
+    for j in range(y_components):
+        for i in range(x_components):
+            normalisation = 1 if i == j == 0 else 2
+            r = g = b = 0.0
+            for y in range(height):
+                cos_y = math.cos(math.pi * j * y / height)
+                row = y * width
+                for x in range(width):
+                    basis = normalisation * math.cos(math.pi * i * x / width) * cos_y
+                    pr, pg, pb = pixels[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = 1 / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83((x_components - 1) + (y_components - 1) * 9, 1)
+    if ac:
+        quantised = max(0, min(82, math.floor(max(abs(v) for f in ac for v in f) * 166 - 0.5)))
+        maximum = (quantised + 1) / 166
+    else:
+        quantised, maximum = 0, 1
+    result += _base83(quantised, 1)
+    result += _base83(
+        (_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4
+    )
+    for factor in ac:
+        r, g, b = (
+            max(0, min(18, math.floor(_sign_pow(v / maximum, 0.5) * 9 + 9.5))) for v in factor
+        )
+        result += _base83(r * 19 * 19 + g * 19 + b, 2)
+    return result
+
+
+def dominant_color(image):
+    quantized = image.quantize(colors=5, method=Image.Quantize.MEDIANCUT)
+    _, index = max(quantized.getcolors())
+    r, g, b = quantized.getpalette()[index * 3:index * 3 + 3]
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def image_metadata(source):
+    """Ancho/alto (ya orientados por EXIF), tamaño, color dominante y placeholder."""
+    with Image.open(io.BytesIO(source)) as original:
+        width, height = original.size
+        if original.getexif().get(0x0112) in (5, 6, 7, 8):
+            width, height = height, width
+        original.draft("RGB", (SAMPLE_SIZE * 2, SAMPLE_SIZE * 2))
+        sample = _flatten(ImageOps.exif_transpose(original))
+    sample = sample.resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.Resampling.BILINEAR)
+    return {
+        "width": width,
+        "height": height,
+        "size_bytes": len(source),
+        "dominant_color": dominant_color(sample),
+        "placeholder": blurhash(sample),
+    }
@@ -0,0 +1,320 @@
+import http.client
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from urllib.parse import urlencode, urlsplit
+
+from .slowqueries import percentile
+
+
+# ======================================================
+# PRUEBA DE CARGA (manage.py loadtest)
+# ======================================================
+# Hilos con conexiones HTTP persistentes (solo biblioteca estándar) repiten
+# escenarios elegidos por peso contra un servidor ya levantado (runserver,
+# gunicorn). Cada petición se registra con un nombre estable ("packages.list",
+# "carts.simulate_payment"...) para comparar corridas: RPS, p50/p95/p99 y
+# tasa de error por nombre y en total. El reporte es JSON y puede compararse
+# contra una línea base guardada de una corrida anterior.
+DEFAULT_WEIGHTS = {
+    "browse": 35,
+    "search": 20,
+    "detail": 20,
+    "checkout": 5,
+    "pageviews": 15,
+    "dashboard": 5,
+}
+
+PAGEVIEW_BURST = 10
+STATIC_PATHS = ["/", "/paquetes", "/nosotros", "/contacto", "/carrito"]
+
+
+class Client:
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.connection = None
+
+    def request(self, method, path, data=None, headers=None):
+        body = None
+        headers = {"Accept": "application/json", **(headers or {})}
+        if data is not None:
+            body = json.dumps(data).encode()
+            headers["Content-Type"] = "application/json"
+        if self.connection is None:
+            self.connection = self.connection_class(self.netloc, timeout=self.timeout)
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            # Conexión cerrada por el servidor: la próxima petición abre otra.
+            self.connection.close()
+            self.connection = None
+            raise
+        if response.getheader("Connection", "").lower() == "close":
+            self.connection.close()
+            self.connection = None
+        return response.status, payload
+
+
+class Recorder:
+    def __init__(self):
+        self.endpoints = {}
+        self.scenarios = {}
+
+    def record(self, name, elapsed, status, ok):
+        entry = self.endpoints.setdefault(name, {"latencies": [], "errors": 0, "statuses": {}})
+        entry["latencies"].append(elapsed)
+        if not ok:
+            entry["errors"] += 1
+        key = str(status)
+        entry["statuses"][key] = entry["statuses"].get(key, 0) + 1
+
+    def scenario(self, name, ok):
+        entry = self.scenarios.setdefault(name, {"runs": 0, "errors": 0})
+        entry["runs"] += 1
+        if not ok:
+            entry["errors"] += 1
+
+    def merge(self, other):
+        for name, entry in other.endpoints.items():
+            merged = self.endpoints.setdefault(name, {"latencies": [], "errors": 0, "statuses": {}})
+            merged["latencies"].extend(entry["latencies"])
+            merged["errors"] += entry["errors"]
+            for status, count in entry["statuses"].items():
+                merged["statuses"][status] = merged["statuses"].get(status, 0) + count
+        for name, entry in other.scenarios.items():
+            merged = self.scenarios.setdefault(name, {"runs": 0, "errors": 0})
+            merged["runs"] += entry["runs"]
+            merged["errors"] += entry["errors"]
+
+
+class ScenarioError(Exception):
+    pass
+
+
+class Session:
+    """Un usuario virtual: su cliente HTTP, su Random y sus mediciones."""
+
+    def __init__(self, harness, index):
+        self.harness = harness
+        self.client = Client(harness.base_url, harness.timeout)
+        self.rng = random.Random(f"{harness.seed}:{index}")
+        self.recorder = Recorder()
+
+    def call(self, name, method, path, data=None, expected=(200,), headers=None):
+        start = time.perf_counter()
+        try:
+            status, payload = self.client.request(method, path, data, headers)
+        except (OSError, http.client.HTTPException):
+            status, payload = 0, b""
+        elapsed = time.perf_counter() - start
+        ok = status in expected
+        self.recorder.record(name, elapsed, status, ok)
+        if not ok:
+            raise ScenarioError(f"{name}: {status}")
+        try:
+            return json.loads(payload) if payload else {}
+        except ValueError:
+            return {}
+
+    # ---- Escenarios ----
+    def browse(self):
+        self.call("bootstrap", "GET", "/api/v1/bootstrap/")
+        page = self.call("packages.list", "GET", "/api/v1/packages/")
+        for _ in range(self.rng.randint(0, 3)):
+            if not page.get("next"):
+                break
+            next_url = urlsplit(page["next"])
+            page = self.call("packages.list_next", "GET", f"{next_url.path}?{next_url.query}")
+
+    def search(self):
+        term = self.rng.choice(self.harness.search_terms)
+        if self.rng.random() < 0.3:
+            # Búsqueda mientras se escribe: el buscador completa por prefijo.
+            term = term[: max(3, len(term) - 2)]
+        self.call("packages.search", "GET", "/api/v1/packages/?" + urlencode({"search": term}))
+
+    def detail(self):
+        package_id = self.rng.choice(self.harness.package_ids)
+        self.call("packages.retrieve", "GET", f"/api/v1/packages/{package_id}/")
+        month = (date.today() + timedelta(days=30 * self.rng.randint(0, 5))).strftime("%Y-%m")
+        self.call("packages.availability", "GET", f"/api/v1/packages/{package_id}/availability/?month={month}")
+
+    def checkout(self):
+        customer = self.rng.randrange(1000000)
+        cart = self.call(
+            "carts.create", "POST", "/api/v1/carts/",
+            {"email": f"carga{customer}@ejemplo.com", "phone": f"9{customer:08d}", "nationality": "Perú"},
+            expected=(201,),
+        )
+        travel_date = date.today() + timedelta(days=self.rng.randint(7, 180))
+        # 409 = sin cupo para esa fecha: respuesta válida bajo carga.
+        self.call(
+            "carts.add_item", "POST", f"/api/v1/carts/{cart['id']}/add_item/",
+            {
+                "package_id": self.rng.choice(self.harness.package_ids),
+                "full_name": "Cliente de carga",
+                "travel_date": travel_date.isoformat(),
+                "adults": self.rng.randint(1, 3),
+            },
+            expected=(201, 409),
+        )
+        # 400 = carrito vacío porque el item anterior no tuvo cupo.
+        self.call(
+            "carts.simulate_payment", "POST", f"/api/v1/carts/{cart['id']}/simulate_payment/", {},
+            expected=(200, 400),
+        )
+
+    def pageviews(self):
+        for _ in range(PAGEVIEW_BURST):
+            if self.harness.slugs and self.rng.random() < 0.6:
+                path = f"/paquetes/{self.rng.choice(self.harness.slugs)}"
+            else:
+                path = self.rng.choice(STATIC_PATHS)
+            self.call("track_pageview", "POST", "/api/v1/track-pageview/", {"path": path})
+
+    def dashboard(self):
+        self.call(
+            "admin.dashboard", "GET", "/api/v1/admin/dashboard/",
+            headers={"Authorization": f"Bearer {self.harness.admin_token}"},
+        )
+
+    def run(self, deadline):
+        names = list(self.harness.weights)
+        weights = list(self.harness.weights.values())
+        while time.monotonic() < deadline:
+            name = self.rng.choices(names, weights=weights)[0]
+            try:
+                getattr(self, name)()
+            except Exception:
+                # ScenarioError o una respuesta inesperada (JSON sin "id", etc.).
+                self.recorder.scenario(name, False)
+            else:
+                self.recorder.scenario(name, True)
+
+
+class LoadTest:
+    def __init__(self, base_url, concurrency=10, duration=30, weights=None, seed=1,
+                 admin_user=None, admin_password=None, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.duration = duration
+        self.weights = {name: weight for name, weight in (weights or DEFAULT_WEIGHTS).items() if weight > 0}
+        self.seed = seed
+        self.admin_user = admin_user
+        self.admin_password = admin_password
+        self.timeout = timeout
+        self.admin_token = None
+        self.package_ids, self.slugs, self.search_terms = [], [], []
+
+    def discover(self):
+        """Lee del servidor paquetes y términos de búsqueda reales; obtiene el JWT del admin."""
+        client = Client(self.base_url, self.timeout)
+        status, payload = client.request("GET", "/api/v1/packages/?page_size=48")
+        if status != 200:
+            raise ValueError(f"GET /api/v1/packages/ respondió {status}; ¿está levantado el servidor?")
+        results = json.loads(payload).get("results", [])
+        if not results:
+            raise ValueError("No hay paquetes; genere datos con manage.py seed_scale.")
+        self.package_ids = [item["id"] for item in results]
+        self.slugs = [item["slug"] for item in results if item.get("slug")]
+        words = {word.lower() for item in results for word in item.get("title", "").split() if len(word) > 3}
+        self.search_terms = sorted(words) or ["selva"]
+
+        if "dashboard" in self.weights:
+            if not (self.admin_user and self.admin_password):
+                raise ValueError("El escenario dashboard necesita --admin-user y --admin-password (o peso 0).")
+            status, payload = client.request(
+                "POST", "/api/token/", {"username": self.admin_user, "password": self.admin_password}
+            )
+            if status != 200:
+                raise ValueError(f"No se pudo obtener el JWT del admin ({status}).")
+            self.admin_token = json.loads(payload)["access"]
+
+    def run(self):
+        self.discover()
+        sessions = [Session(self, index) for index in range(self.concurrency)]
+        started = time.monotonic()
+        deadline = started + self.duration
+        threads = [
+            threading.Thread(target=session.run, args=(deadline,), name=f"loadtest-{index}")
+            for index, session in enumerate(sessions)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        recorder = Recorder()
+        for session in sessions:
+            recorder.merge(session.recorder)
+        return build_report(recorder, elapsed, {
+            "base_url": self.base_url,
+            "concurrency": self.concurrency,
+            "duration_s": self.duration,
+            "seed": self.seed,
+            "weights": self.weights,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        })
+
+
+# ======================================================
+# REPORTE Y COMPARACIÓN
+# ======================================================
+def _summary(latencies, errors, elapsed):
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0,
+        "rps": round(count / elapsed, 2) if elapsed else 0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(max(latencies, default=0) * 1000, 2),
+    }
+
+
+def build_report(recorder, elapsed, meta):
+    endpoints = {}
+    every, errors = [], 0
+    for name, entry in sorted(recorder.endpoints.items()):
+        endpoints[name] = {**_summary(entry["latencies"], entry["errors"], elapsed), "statuses": entry["statuses"]}
+        every.extend(entry["latencies"])
+        errors += entry["errors"]
+    return {
+        "meta": {**meta, "elapsed_s": round(elapsed, 2)},
+        "totals": _summary(every, errors, elapsed),
+        "endpoints": endpoints,
+        "scenarios": recorder.scenarios,
+    }
+
+
+def compare(report, baseline, tolerance=0.2):
+    """Devuelve filas (nombre, métrica, base, actual, cambio, ¿regresión?) para lo que está en ambos."""
+    rows = []
+    pairs = [("total", report["totals"], baseline["totals"])]
+    pairs += [
+        (name, stats, baseline["endpoints"][name])
+        for name, stats in report["endpoints"].items()
+        if name in baseline.get("endpoints", {})
+    ]
+    for name, current, base in pairs:
+        for metric, worse_if_higher in (("rps", False), ("p95_ms", True), ("p99_ms", True), ("error_rate", True)):
+            before, after = base.get(metric, 0), current.get(metric, 0)
+            if metric == "error_rate":
+                change = after - before
+                regression = change > 0.01
+            else:
+                change = (after - before) / before if before else 0
+                regression = change > tolerance if worse_if_higher else change < -tolerance
+            rows.append((name, metric, before, after, change, regression))
+    return rows
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from turismo.derivatives import image_pipeline
+
+
+class Command(BaseCommand):
+    help = "Genera las variantes (thumb/card/full, WebP y JPEG) de las imágenes que no las tengan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Regenera también las que ya existen.")
+
+    def handle(self, *args, **options):
+        done, skipped = image_pipeline.regenerate(force=options["force"])
+        self.stdout.write(self.style.SUCCESS(f"{done} imágenes procesadas, {skipped} omitidas o con error."))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from turismo.expiry import DEFAULT_BATCH_SIZE, expire_overdue_carts
+
+
+class Command(BaseCommand):
+    help = "Expira los carritos vencidos y cancela sus reservas pendientes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Ejecutar continuamente.")
+        parser.add_argument("--interval", type=int, default=60, help="Segundos entre pasadas con --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            total = expire_overdue_carts(batch_size=options["batch_size"])
+            self.stdout.write(f"{total} carritos expirados.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
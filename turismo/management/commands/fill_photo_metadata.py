@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from turismo.cache import bump_version
+from turismo.models import PackagePhoto
+
+
+class Command(BaseCommand):
+    help = "Calcula tamaño, color dominante y placeholder de las fotos subidas antes de guardarlos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        pending = PackagePhoto.objects.filter(width__isnull=True).exclude(image="").order_by("id")
+        done = failed = 0
+        batch = []
+        for photo in pending.iterator(chunk_size=options["batch_size"]):
+            try:
+                with photo.image.open("rb") as fh:
+                    photo.set_image_metadata(fh.read())
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Foto #{photo.id}: {exc}")
+                continue
+            batch.append(photo)
+            if len(batch) >= options["batch_size"]:
+                PackagePhoto.objects.bulk_update(batch, PackagePhoto.METADATA_FIELDS)
+                done += len(batch)
+                batch = []
+        if batch:
+            PackagePhoto.objects.bulk_update(batch, PackagePhoto.METADATA_FIELDS)
+            done += len(batch)
+        if done:
+            bump_version(PackagePhoto)
+        self.stdout.write(self.style.SUCCESS(f"{done} fotos actualizadas, {failed} con error."))
@@ -0,0 +1,88 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from turismo.loadtest import DEFAULT_WEIGHTS, LoadTest, compare
+
+
+def parse_weights(value):
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in filter(None, value.split(",")):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_WEIGHTS or not weight.isdigit():
+            raise ValueError(f"Escenario inválido: {part!r} (disponibles: {', '.join(DEFAULT_WEIGHTS)})")
+        weights[name] = int(weight)
+    return weights
+
+
+class Command(BaseCommand):
+    help = "Prueba de carga contra un servidor levantado: RPS, p50/p95/p99 y errores por endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--concurrency", type=int, default=10, help="Usuarios virtuales (hilos).")
+        parser.add_argument("--duration", type=int, default=30, help="Segundos de carga.")
+        parser.add_argument(
+            "--scenarios", default="",
+            help="Pesos, p. ej. 'browse=50,search=30,dashboard=0' (el resto usa los pesos por defecto).",
+        )
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--admin-user", help="Para el escenario dashboard (JWT).")
+        parser.add_argument("--admin-password")
+        parser.add_argument("--output", help="Guarda el reporte JSON en este archivo.")
+        parser.add_argument("--baseline", help="Reporte JSON previo con el que comparar.")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.2,
+            help="Variación relativa de RPS/p95/p99 aceptada frente a la línea base (0.2 = 20%%).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            weights = parse_weights(options["scenarios"])
+            baseline = None
+            if options["baseline"]:
+                with open(options["baseline"]) as fh:
+                    baseline = json.load(fh)
+            report = LoadTest(
+                options["base_url"],
+                concurrency=options["concurrency"],
+                duration=options["duration"],
+                weights=weights,
+                seed=options["seed"],
+                admin_user=options["admin_user"],
+                admin_password=options["admin_password"],
+            ).run()
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(f"{'endpoint':28} {'req':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err%':>6}")
+        for name, stats in [*report["endpoints"].items(), ("TOTAL", report["totals"])]:
+            self.stdout.write(
+                f"{name:28} {stats['requests']:>7} {stats['rps']:>8.1f} {stats['p50_ms']:>8.1f} "
+                f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['error_rate'] * 100:>6.2f}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Reporte guardado en {options['output']}")
+
+        if baseline is None:
+            self.stdout.write(self.style.SUCCESS(f"{report['totals']['requests']} peticiones en {report['meta']['elapsed_s']}s."))
+            return
+
+        regressions = 0
+        for name, metric, before, after, change, regression in compare(report, baseline, options["tolerance"]):
+            if metric == "error_rate":
+                delta = f"{change * 100:+.2f} pp"
+            else:
+                delta = f"{change * 100:+.1f}%"
+            line = f"{name:28} {metric:10} {before:>10} -> {after:<10} {delta}"
+            if regression:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(f"{regressions} métricas empeoraron más de lo tolerado frente a la línea base.")
+        self.stdout.write(self.style.SUCCESS("Sin regresiones frente a la línea base."))
@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from turismo.derivatives import IMAGE_FIELDS
+from turismo.storage import CAS_PREFIX, ContentAddressedStorage
+
+
+def _walk(storage, path):
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield f"{path}/{name}"
+    for directory in directories:
+        yield from _walk(storage, f"{path}/{directory}")
+
+
+def _is_referenced(name):
+    for model, (image_field, variants_field) in IMAGE_FIELDS.items():
+        if model.objects.filter(Q(**{image_field: name}) | Q(**{f"{variants_field}__icontains": name})).exists():
+            return True
+    return False
+
+
+class Command(BaseCommand):
+    help = "Borra los blobs del storage por contenido que ya no referencia ninguna imagen ni variante."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Solo informa, no borra.")
+        parser.add_argument(
+            "--min-age-hours", type=float, default=24,
+            help="No toca blobs más nuevos (subidas cuya fila aún no se guardó)."
+        )
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError("El storage por defecto no es ContentAddressedStorage.")
+
+        referenced = set()
+        for model, (image_field, variants_field) in IMAGE_FIELDS.items():
+            for name, variants in model.objects.values_list(image_field, variants_field).iterator():
+                if name:
+                    referenced.add(name)
+                for entry in (variants or {}).values():
+                    if isinstance(entry, dict):
+                        referenced.update(v for k, v in entry.items() if k not in ("width", "height"))
+
+        if not default_storage.exists(CAS_PREFIX):
+            self.stdout.write("No hay blobs.")
+            return
+
+        cutoff = timezone.now() - timedelta(hours=options["min_age_hours"])
+        orphans = [
+            name for name in _walk(default_storage, CAS_PREFIX)
+            if name not in referenced and default_storage.get_modified_time(name) < cutoff
+        ]
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"{len(orphans)} blobs huérfanos."))
+            return
+
+        # El conjunto de referencias puede quedar viejo mientras se recorre el
+        # disco: justo antes de cada borrado se vuelve a mirar la fecha (una
+        # subida repetida la renueva) y si alguna fila empezó a usar el blob.
+        purged = 0
+        for name in orphans:
+            if default_storage.get_modified_time(name) >= cutoff or _is_referenced(name):
+                continue
+            default_storage.purge(name)
+            purged += 1
+        self.stdout.write(self.style.SUCCESS(f"{purged} blobs borrados."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from turismo.availability import rebuild_capacity_ledger
+
+
+class Command(BaseCommand):
+    help = "Recalcula los cupos ocupados por paquete y fecha a partir de las reservas activas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_capacity_ledger(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{total} fechas con cupos ocupados."))
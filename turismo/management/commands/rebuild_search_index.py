@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from turismo.search import reindex_packages
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de búsqueda de paquetes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = reindex_packages(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{total} paquetes indexados."))
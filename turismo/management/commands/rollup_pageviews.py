@@ -0,0 +1,25 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from turismo.rollups import DEFAULT_BATCH_SIZE, rollup_pageviews
+
+
+class Command(BaseCommand):
+    help = "Agrega las visitas nuevas en las tablas diarias y mensuales."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--lag", type=int, default=60, help="Segundos de margen para visitas recientes.")
+        parser.add_argument("--loop", action="store_true", help="Ejecutar continuamente.")
+        parser.add_argument("--interval", type=int, default=60, help="Segundos entre pasadas con --loop.")
+
+    def handle(self, *args, **options):
+        lag = timedelta(seconds=options["lag"])
+        while True:
+            total = rollup_pageviews(batch_size=options["batch_size"], lag=lag)
+            self.stdout.write(f"{total} visitas agregadas.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,43 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from turismo.seeding import ScaleSeeder
+
+
+class Command(BaseCommand):
+    help = "Genera datos sintéticos a escala (paquetes, reservas, carritos, pagos y visitas) de forma determinista."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42, help="Misma semilla, mismos datos.")
+        parser.add_argument("--packages", type=int, default=2000)
+        parser.add_argument("--reservations", type=int, default=200000, help="Reservas directas (sin carrito).")
+        parser.add_argument("--carts", type=int, default=100000, help="Cada carrito trae 1-3 items con su reserva.")
+        parser.add_argument("--pageviews", type=int, default=1000000)
+        parser.add_argument("--days", type=int, default=365, help="Ventana de fechas de creación y de viaje.")
+        parser.add_argument(
+            "--until", type=date.fromisoformat, default=None,
+            help="Fecha de referencia YYYY-MM-DD (hoy por defecto); con la misma semilla y fecha los datos son idénticos.",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--workers", type=int, default=1, help="Procesos en paralelo (en SQLite siempre 1).")
+
+    def handle(self, *args, **options):
+        seeder = ScaleSeeder(
+            seed=options["seed"],
+            packages=options["packages"],
+            reservations=options["reservations"],
+            carts=options["carts"],
+            pageviews=options["pageviews"],
+            days=options["days"],
+            until=options["until"],
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            log=self.stdout.write,
+        )
+        try:
+            totals = seeder.run()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        summary = ", ".join(f"{count} {name}" for name, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(f"Datos generados: {summary}."))
@@ -0,0 +1,158 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_safe
+
+from .storage import digest_from_name
+
+mimetypes.add_type("image/webp", ".webp")
+
+
+# ======================================================
+# SERVIDO DE ARCHIVOS MULTIMEDIA
+# ======================================================
+# En producción Django solo valida la ruta, arma los encabezados (ETag fuerte,
+# Cache-Control, 304) y delega los bytes al servidor web:
+# - "nginx":    X-Accel-Redirect hacia una location internal que apunte a MEDIA_ROOT;
+# - "sendfile": X-Sendfile con la ruta absoluta (Apache mod_xsendfile, lighttpd).
+# Sin ACCEL (desarrollo) los sirve Django en streaming, con soporte de Range.
+# Los blobs por contenido (cas/...) nunca cambian: ETag = digest e "immutable".
+DEFAULTS = {
+    "ACCEL": None,
+    "ACCEL_PREFIX": "/protected-media/",
+    "IMMUTABLE_MAX_AGE": 60 * 60 * 24 * 365,
+    "MAX_AGE": 60 * 60,
+    "CHUNK_SIZE": 64 * 1024,
+}
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _options():
+    return {**DEFAULTS, **getattr(settings, "MEDIA_SERVING", {})}
+
+
+def _etag(path, stat):
+    digest = digest_from_name(path)
+    if digest:
+        return f'"{digest}"'
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _parse_range(header, size):
+    """Devuelve (inicio, fin) inclusive, None si no aplica, o False si es insatisfacible."""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Varios rangos o formato desconocido: se responde el archivo completo.
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _stream(full_path, start, length, chunk_size):
+    with open(full_path, "rb") as fh:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fh.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Archivo no encontrado")
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404("Archivo no encontrado")
+    if not os.path.isfile(full_path):
+        raise Http404("Archivo no encontrado")
+
+    options = _options()
+    etag = _etag(path, stat)
+    if digest_from_name(path):
+        cache_control = f"public, max-age={options['IMMUTABLE_MAX_AGE']}, immutable"
+    else:
+        cache_control = f"public, max-age={options['MAX_AGE']}"
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        for name, value in headers.items():
+            not_modified.headers[name] = value
+        return not_modified
+
+    if options["ACCEL"] == "nginx":
+        response = HttpResponse(content_type=content_type or "application/octet-stream")
+        response["X-Accel-Redirect"] = options["ACCEL_PREFIX"].rstrip("/") + "/" + quote(path)
+    elif options["ACCEL"] == "sendfile":
+        response = HttpResponse(content_type=content_type or "application/octet-stream")
+        response["X-Sendfile"] = full_path
+    else:
+        response = _python_response(request, full_path, stat.st_size, etag, content_type, options)
+
+    for name, value in headers.items():
+        response.headers[name] = value
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def _python_response(request, full_path, size, etag, content_type, options):
+    start, end = 0, size - 1
+    partial = False
+
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    # Con If-Range que no coincide se ignora el rango y se manda todo.
+    if range_header and (not if_range or etag in parse_etags(if_range)):
+        parsed = _parse_range(range_header, size)
+        if parsed is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+        if parsed:
+            (start, end), partial = parsed, True
+
+    length = end - start + 1 if size else 0
+    response = StreamingHttpResponse(
+        _stream(full_path, start, length, options["CHUNK_SIZE"]),
+        status=206 if partial else 200,
+        content_type=content_type or "application/octet-stream",
+    )
+    response["Content-Length"] = str(length)
+    if partial:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
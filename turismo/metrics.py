@@ -0,0 +1,290 @@
+import atexit
+import glob
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import BasePermission
+from rest_framework.renderers import BaseRenderer
+
+
+# ======================================================
+# MÉTRICAS POR VISTA (PROMETHEUS)
+# ======================================================
+# MetricsMiddleware mide cada petición y la agrega por vista/acción resuelta
+# (p. ej. "CartViewSet.simulate_payment") y método: estados, histogramas de
+# latencia, consultas ORM y tamaño de respuesta, y tiempo total en SQL.
+# Cada proceso agrega en memoria; con MULTIPROCESS_DIR además vuelca su estado
+# a "<dir>/metrics-<pid>.json" cada FLUSH_INTERVAL segundos y /metrics suma
+# los archivos de todos los workers.
+DEFAULTS = {
+    "ENABLED": True,
+    "MULTIPROCESS_DIR": None,
+    "FLUSH_INTERVAL": 5.0,
+    "SCRAPE_TOKEN": None,
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _options():
+    return {**DEFAULTS, **getattr(settings, "METRICS", {})}
+
+
+def _bucket_index(buckets, value):
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            return index
+    return len(buckets)
+
+
+def _new_series():
+    return {
+        "statuses": {},
+        "latency": [0] * (len(LATENCY_BUCKETS) + 1),
+        "latency_sum": 0.0,
+        "queries": [0] * (len(QUERY_BUCKETS) + 1),
+        "queries_sum": 0,
+        "query_seconds": 0.0,
+        "size": [0] * (len(SIZE_BUCKETS) + 1),
+        "size_sum": 0,
+        "count": 0,
+    }
+
+
+def _merge(target, source):
+    for key, series in source.items():
+        merged = target.setdefault(key, _new_series())
+        for status, count in series["statuses"].items():
+            merged["statuses"][status] = merged["statuses"].get(status, 0) + count
+        for name in ("latency", "queries", "size"):
+            merged[name] = [a + b for a, b in zip(merged[name], series[name])]
+        for name in ("latency_sum", "queries_sum", "query_seconds", "size_sum", "count"):
+            merged[name] += series[name]
+    return target
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._series = {}
+        self._last_flush = 0.0
+
+    def record(self, view, method, status, latency, queries, query_seconds, size):
+        key = f"{view}|{method}"
+        with self._lock:
+            if self._pid != os.getpid():
+                # Proceso hijo de un fork: no hereda los conteos del padre.
+                self._reset()
+            series = self._series.setdefault(key, _new_series())
+            status = str(status)
+            series["statuses"][status] = series["statuses"].get(status, 0) + 1
+            series["latency"][_bucket_index(LATENCY_BUCKETS, latency)] += 1
+            series["latency_sum"] += latency
+            series["queries"][_bucket_index(QUERY_BUCKETS, queries)] += 1
+            series["queries_sum"] += queries
+            series["query_seconds"] += query_seconds
+            series["size"][_bucket_index(SIZE_BUCKETS, size)] += 1
+            series["size_sum"] += size
+            series["count"] += 1
+
+        directory = _options()["MULTIPROCESS_DIR"]
+        if directory and time.monotonic() - self._last_flush >= _options()["FLUSH_INTERVAL"]:
+            self.flush(directory)
+
+    def snapshot(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            return json.loads(json.dumps(self._series))
+
+    def flush(self, directory):
+        self._last_flush = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+        with os.fdopen(fd, "w") as fh:
+            json.dump(self.snapshot(), fh)
+        os.replace(tmp, os.path.join(directory, f"metrics-{os.getpid()}.json"))
+
+    def collect(self):
+        directory = _options()["MULTIPROCESS_DIR"]
+        if not directory:
+            return self.snapshot()
+
+        self.flush(directory)
+        merged = {}
+        for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+            try:
+                with open(path) as fh:
+                    _merge(merged, json.load(fh))
+            except (OSError, ValueError):
+                continue
+        return merged
+
+
+registry = MetricsRegistry()
+
+
+@atexit.register
+def _flush_on_exit():
+    directory = _options()["MULTIPROCESS_DIR"]
+    if directory and registry._series:
+        registry.flush(directory)
+
+
+# ======================================================
+# MIDDLEWARE
+# ======================================================
+def view_name(view_func, method):
+    cls = getattr(view_func, "cls", None)
+    if cls is None:
+        return f"{view_func.__module__}.{view_func.__name__}"
+    actions = getattr(view_func, "actions", None)
+    if actions:
+        return f"{cls.__name__}.{actions.get(method.lower(), method.lower())}"
+    # @api_view: DRF nombra la clase envoltorio como la función.
+    return cls.__name__
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not _options()["ENABLED"]:
+            return self.get_response(request)
+
+        request._metrics_view = "unresolved"
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        latency = time.perf_counter() - start
+
+        if response.streaming:
+            size = int(response.get("Content-Length") or 0)
+        else:
+            size = len(response.content)
+        registry.record(
+            request._metrics_view, request.method, response.status_code,
+            latency, counter.count, counter.seconds, size,
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_view = view_name(view_func, request.method)
+
+
+# ======================================================
+# EXPOSICIÓN /metrics
+# ======================================================
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(view, method, **extra):
+    labels = {"view": view, "method": method, **extra}
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _histogram(lines, name, help_text, buckets, data, counts_key, sum_key):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, series in sorted(data.items()):
+        view, method = key.split("|", 1)
+        cumulative = 0
+        for bound, count in zip(list(buckets) + ["+Inf"], series[counts_key]):
+            cumulative += count
+            lines.append(f"{name}_bucket{{{_labels(view, method, le=bound)}}} {cumulative}")
+        lines.append(f"{name}_sum{{{_labels(view, method)}}} {series[sum_key]}")
+        lines.append(f"{name}_count{{{_labels(view, method)}}} {series['count']}")
+
+
+def render_prometheus(data):
+    lines = [
+        "# HELP turismo_http_requests_total Peticiones por vista, método y estado.",
+        "# TYPE turismo_http_requests_total counter",
+    ]
+    for key, series in sorted(data.items()):
+        view, method = key.split("|", 1)
+        for status, count in sorted(series["statuses"].items()):
+            lines.append(f"turismo_http_requests_total{{{_labels(view, method, status=status)}}} {count}")
+
+    _histogram(
+        lines, "turismo_http_request_duration_seconds", "Latencia de la petición.",
+        LATENCY_BUCKETS, data, "latency", "latency_sum",
+    )
+    _histogram(
+        lines, "turismo_http_request_queries", "Consultas ORM por petición.",
+        QUERY_BUCKETS, data, "queries", "queries_sum",
+    )
+    _histogram(
+        lines, "turismo_http_response_size_bytes", "Tamaño del cuerpo de la respuesta.",
+        SIZE_BUCKETS, data, "size", "size_sum",
+    )
+
+    lines.append("# HELP turismo_http_request_query_seconds_total Tiempo total en SQL.")
+    lines.append("# TYPE turismo_http_request_query_seconds_total counter")
+    for key, series in sorted(data.items()):
+        view, method = key.split("|", 1)
+        lines.append(f"turismo_http_request_query_seconds_total{{{_labels(view, method)}}} {series['query_seconds']}")
+    return "\n".join(lines) + "\n"
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        return json.dumps(data).encode(self.charset)
+
+
+class CanScrapeMetrics(BasePermission):
+    # Admin (JWT) o el token del scraper en "X-Metrics-Token".
+    def has_permission(self, request, view):
+        token = _options()["SCRAPE_TOKEN"]
+        sent = request.headers.get("X-Metrics-Token")
+        if token and sent and secrets.compare_digest(token, sent):
+            return True
+        return bool(request.user and request.user.is_staff)
+
+
+@api_view(["GET"])
+@permission_classes([CanScrapeMetrics])
+@renderer_classes([PrometheusRenderer])
+def metrics_view(request):
+    return HttpResponse(
+        render_prometheus(registry.collect()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,121 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:20
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Copia del analizador de turismo/search.py tal como estaba en esta migración:
+# si search.py cambia, la migración debe seguir generando el mismo índice.
+STOPWORDS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes asi aun cada como con
+contra cual cuando de del desde donde dos e el ella ellas ellos en entre era eran
+es esa esas ese eso esos esta estan estas este esto estos fue fueron ha han hasta
+hay la las le les lo los mas me mi mis muy nada ni no nos o otra otras otro otros
+para pero poco por porque que quien se sea ser si sin sobre solo son su sus tambien
+te tiene tienen todo todos tu tus un una unas uno unos usted y ya
+""".split())
+
+FIELD_WEIGHTS = (
+    ("title", 8),
+    ("category", 4),
+    ("short_description", 2),
+    ("description", 1),
+)
+
+TERM_MAX_LENGTH = 60
+
+_WORD_RE = re.compile(r"[a-z0-9ñ]+")
+
+
+def fold(text):
+    text = (text or "").lower().replace("ñ", "\x00")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return text.replace("\x00", "ñ")
+
+
+def stem(word):
+    if len(word) < 5:
+        return word
+    if word[-1] in "oae":
+        return word[:-1]
+    if word[-1] == "s":
+        if word.endswith("eses"):
+            return word[:-2]
+        if word.endswith("ces"):
+            return word[:-3] + "z"
+        if word[-2] in "oae":
+            return word[:-2]
+    return word
+
+
+def tokenize(text):
+    return [
+        stem(w)[:TERM_MAX_LENGTH]
+        for w in _WORD_RE.findall(fold(text))
+        if len(w) > 1 and w not in STOPWORDS
+    ]
+
+
+def build_terms(title="", category="", short_description="", description=""):
+    fields = {
+        "title": title,
+        "category": category,
+        "short_description": short_description,
+        "description": description,
+    }
+    terms = {}
+    for field, weight in FIELD_WEIGHTS:
+        for term in set(tokenize(fields[field])):
+            terms[term] = terms.get(term, 0) + weight
+    return terms
+
+
+def build_index(apps, schema_editor):
+    Package = apps.get_model("turismo", "Package")
+    PackageSearchTerm = apps.get_model("turismo", "PackageSearchTerm")
+
+    batch = []
+    for package in Package.objects.select_related("category").iterator(chunk_size=500):
+        terms = build_terms(
+            title=package.title,
+            category=package.category.name,
+            short_description=package.short_description,
+            description=package.description,
+        )
+        batch.extend(
+            PackageSearchTerm(package_id=package.pk, term=term, weight=weight)
+            for term, weight in terms.items()
+        )
+        if len(batch) >= 5000:
+            PackageSearchTerm.objects.bulk_create(batch)
+            batch = []
+    PackageSearchTerm.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turismo', '0003_cart_cartitem_payment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PackageSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=60, verbose_name='Término')),
+                ('weight', models.PositiveSmallIntegerField(default=1, verbose_name='Peso')),
+                ('package', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='turismo.package', verbose_name='Paquete')),
+            ],
+            options={
+                'verbose_name': 'Término de búsqueda',
+                'verbose_name_plural': 'Términos de búsqueda',
+                'constraints': [models.UniqueConstraint(fields=('term', 'package'), name='uniq_search_term_package')],
+            },
+        ),
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
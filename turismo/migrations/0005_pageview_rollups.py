@@ -0,0 +1,57 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turismo', '0004_packagesearchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=60, unique=True, verbose_name='Proceso')),
+                ('last_id', models.BigIntegerField(default=0, verbose_name='Último id procesado')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Actualizado el')),
+            ],
+            options={
+                'verbose_name': 'Marca de agregación',
+                'verbose_name_plural': 'Marcas de agregación',
+            },
+        ),
+        migrations.CreateModel(
+            name='PageViewDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('path', models.CharField(max_length=200, verbose_name='Ruta')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Visitas')),
+            ],
+            options={
+                'verbose_name': 'Visitas por día',
+                'verbose_name_plural': 'Visitas por día',
+                'ordering': ['-date', 'path'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'path'), name='uniq_pageview_daily')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PageViewMonthly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Año')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='Mes')),
+                ('path', models.CharField(max_length=200, verbose_name='Ruta')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Visitas')),
+            ],
+            options={
+                'verbose_name': 'Visitas por mes',
+                'verbose_name_plural': 'Visitas por mes',
+                'ordering': ['-year', '-month', 'path'],
+                'constraints': [models.UniqueConstraint(fields=('year', 'month', 'path'), name='uniq_pageview_monthly')],
+            },
+        ),
+    ]
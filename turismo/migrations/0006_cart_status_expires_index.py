@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turismo', '0005_pageview_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['status', 'expires_at'], name='cart_status_expires_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:27
+
+import re
+
+from django.db import migrations, models
+
+
+def backfill_contact(apps, schema_editor):
+    Reservation = apps.get_model("turismo", "Reservation")
+
+    last_id = 0
+    while True:
+        batch = list(
+            Reservation.objects
+            .filter(id__gt=last_id)
+            .order_by("id")
+            .only("id", "email", "phone")[:2000]
+        )
+        if not batch:
+            break
+        for reservation in batch:
+            reservation.email_normalized = (reservation.email or "").strip().lower()
+            reservation.phone_digits = re.sub(r"\D", "", reservation.phone or "")
+        Reservation.objects.bulk_update(batch, ["email_normalized", "phone_digits"])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turismo', '0006_cart_status_expires_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='email_normalized',
+            field=models.CharField(default='', editable=False, max_length=254, verbose_name='Correo normalizado'),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='phone_digits',
+            field=models.CharField(default='', editable=False, max_length=40, verbose_name='Teléfono (solo dígitos)'),
+        ),
+        migrations.RunPython(backfill_contact, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['email_normalized', 'phone_digits'], name='reservation_contact_idx'),
+        ),
+    ]
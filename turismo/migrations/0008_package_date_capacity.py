@@ -0,0 +1,52 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+
+def backfill_ledger(apps, schema_editor):
+    Reservation = apps.get_model("turismo", "Reservation")
+    PackageDateCapacity = apps.get_model("turismo", "PackageDateCapacity")
+
+    rows = (
+        Reservation.objects
+        .filter(status__in=("PENDIENTE", "CONTACTADO", "CONFIRMADO"), travel_date__isnull=False)
+        .values("package_id", "travel_date")
+        .annotate(seats=Sum(F("adults") + F("children")))
+        .order_by()
+    )
+    PackageDateCapacity.objects.bulk_create(
+        [
+            PackageDateCapacity(package_id=row["package_id"], date=row["travel_date"], reserved=row["seats"])
+            for row in rows if row["seats"]
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turismo', '0007_reservation_contact_lookup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PackageDateCapacity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('reserved', models.PositiveIntegerField(default=0, verbose_name='Asientos reservados')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Actualizado el')),
+                ('package', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='date_capacities', to='turismo.package', verbose_name='Paquete')),
+            ],
+            options={
+                'verbose_name': 'Cupo por fecha',
+                'verbose_name_plural': 'Cupos por fecha',
+                'ordering': ['package', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('package', 'date'), name='uniq_package_date_capacity')],
+            },
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
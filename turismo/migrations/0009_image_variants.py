@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turismo', '0008_package_date_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aboutblock',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Variantes'),
+        ),
+        migrations.AddField(
+            model_name='heroslide',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Variantes'),
+        ),
+        migrations.AddField(
+            model_name='package',
+            name='cover_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Variantes'),
+        ),
+        migrations.AddField(
+            model_name='packagephoto',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Variantes'),
+        ),
+        migrations.AddField(
+            model_name='teammember',
+            name='avatar_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Variantes'),
+        ),
+    ]
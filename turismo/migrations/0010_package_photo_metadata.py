@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turismo', '0009_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='packagephoto',
+            name='dominant_color',
+            field=models.CharField(blank=True, default='', editable=False, max_length=7, verbose_name='Color dominante'),
+        ),
+        migrations.AddField(
+            model_name='packagephoto',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Alto (px)'),
+        ),
+        migrations.AddField(
+            model_name='packagephoto',
+            name='placeholder',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64, verbose_name='Placeholder (blurhash)'),
+        ),
+        migrations.AddField(
+            model_name='packagephoto',
+            name='size_bytes',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, verbose_name='Tamaño (bytes)'),
+        ),
+        migrations.AddField(
+            model_name='packagephoto',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ancho (px)'),
+        ),
+    ]
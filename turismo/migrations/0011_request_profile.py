@@ -0,0 +1,42 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turismo', '0010_package_photo_metadata'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creado el')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Actualizado el')),
+                ('method', models.CharField(max_length=10, verbose_name='Método')),
+                ('path', models.CharField(max_length=255, verbose_name='Ruta')),
+                ('query_string', models.CharField(blank=True, default='', max_length=500, verbose_name='Parámetros')),
+                ('view', models.CharField(blank=True, default='', max_length=150, verbose_name='Vista')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='Estado HTTP')),
+                ('duration_ms', models.FloatField(verbose_name='Duración (ms)')),
+                ('sql_count', models.PositiveIntegerField(default=0, verbose_name='Consultas SQL')),
+                ('sql_ms', models.FloatField(default=0, verbose_name='Tiempo en SQL (ms)')),
+                ('trigger', models.CharField(choices=[('header', 'Encabezado X-Profile'), ('sample', 'Muestreo')], max_length=10, verbose_name='Origen')),
+                ('summary', models.TextField(blank=True, default='', verbose_name='Resumen del perfil')),
+                ('sql_trace', models.JSONField(blank=True, default=list, verbose_name='Traza SQL')),
+                ('raw_stats', models.BinaryField(blank=True, null=True, verbose_name='Estadísticas (pstats)')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='request_profiles', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Perfil de petición',
+                'verbose_name_plural': 'Perfiles de peticiones',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
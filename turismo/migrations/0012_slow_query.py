@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turismo', '0011_request_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creado el')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Actualizado el')),
+                ('fingerprint', models.CharField(max_length=32, unique=True, verbose_name='Huella')),
+                ('sql', models.TextField(verbose_name='SQL normalizado')),
+                ('count', models.PositiveBigIntegerField(default=0, verbose_name='Ejecuciones')),
+                ('total_ms', models.FloatField(default=0, verbose_name='Tiempo total (ms)')),
+                ('max_ms', models.FloatField(default=0, verbose_name='Máximo (ms)')),
+                ('p95_ms', models.FloatField(default=0, verbose_name='p95 (ms)')),
+                ('samples', models.JSONField(blank=True, default=list, verbose_name='Muestras recientes (ms)')),
+                ('views', models.JSONField(blank=True, default=dict, verbose_name='Ejecuciones por vista')),
+                ('last_view', models.CharField(blank=True, default='', max_length=150, verbose_name='Última vista')),
+                ('last_seen', models.DateTimeField(verbose_name='Última vez')),
+                ('explain', models.TextField(blank=True, default='', verbose_name='Plan (EXPLAIN)')),
+                ('explained_at', models.DateTimeField(blank=True, null=True, verbose_name='Plan obtenido el')),
+            ],
+            options={
+                'verbose_name': 'Consulta lenta',
+                'verbose_name_plural': 'Consultas lentas',
+                'ordering': ['-total_ms'],
+            },
+        ),
+    ]
@@ -1,8 +1,19 @@
 from django.db import models
+import re
 import secrets
 from django.utils import timezone
 from datetime import timedelta
 
+from .image_ops import image_metadata
+
+
+def normalize_email(value):
+    return (value or "").strip().lower()
+
+
+def normalize_phone(value):
+    return re.sub(r"\D", "", value or "")
+
 
 # ======================================================
 # BASE ABSTRACTA
@@ -37,6 +48,7 @@ class HeroSlide(Timestamped):
     title = models.CharField("Título", max_length=200)
     subtitle = models.CharField("Subtítulo", max_length=240, blank=True, null=True)
     image = models.ImageField("Imagen", upload_to="hero/")
+    image_variants = models.JSONField("Variantes", default=dict, blank=True, editable=False)
     order = models.PositiveIntegerField("Orden", default=0)
     is_active = models.BooleanField("Activo", default=True)
 
@@ -73,6 +85,7 @@ class AboutBlock(Timestamped):
     body = models.TextField("Contenido")
     icon = models.CharField("Ícono", max_length=60, blank=True, null=True)
     image = models.ImageField("Imagen", upload_to="about/", blank=True, null=True)
+    image_variants = models.JSONField("Variantes", default=dict, blank=True, editable=False)
     order = models.PositiveIntegerField("Orden", default=0)
     is_active = models.BooleanField("Activo", default=True)
 
@@ -100,6 +113,7 @@ class TeamMember(Timestamped):
     role = models.CharField("Cargo", max_length=120)
     bio = models.TextField("Biografía", blank=True, null=True)
     avatar = models.ImageField("Foto", upload_to="team/", blank=True, null=True)
+    avatar_variants = models.JSONField("Variantes", default=dict, blank=True, editable=False)
     order = models.PositiveIntegerField("Orden", default=0)
     is_active = models.BooleanField("Activo", default=True)
 
@@ -195,6 +209,7 @@ class Package(Timestamped):
     description = models.TextField("Descripción completa", blank=True, null=True)
 
     cover = models.ImageField("Imagen principal", upload_to="packages/covers/", blank=True, null=True)
+    cover_variants = models.JSONField("Variantes", default=dict, blank=True, editable=False)
 
     price_from = models.DecimalField("Precio por persona", max_digits=10, decimal_places=2)
     currency = models.CharField("Moneda", max_length=10, default="USD")
@@ -226,13 +241,38 @@ class PackagePhoto(Timestamped):
         verbose_name="Paquete"
     )
     image = models.ImageField("Imagen", upload_to="packages/photos/")
+    image_variants = models.JSONField("Variantes", default=dict, blank=True, editable=False)
     order = models.PositiveIntegerField("Orden", default=0)
 
+    # Se calculan una sola vez al subir la imagen (ver set_image_metadata).
+    width = models.PositiveIntegerField("Ancho (px)", blank=True, null=True, editable=False)
+    height = models.PositiveIntegerField("Alto (px)", blank=True, null=True, editable=False)
+    size_bytes = models.PositiveBigIntegerField("Tamaño (bytes)", blank=True, null=True, editable=False)
+    dominant_color = models.CharField("Color dominante", max_length=7, blank=True, default="", editable=False)
+    placeholder = models.CharField("Placeholder (blurhash)", max_length=64, blank=True, default="", editable=False)
+
     class Meta:
         verbose_name = "Foto del paquete"
         verbose_name_plural = "Fotos del paquete"
         ordering = ["order", "id"]
 
+    METADATA_FIELDS = ("width", "height", "size_bytes", "dominant_color", "placeholder")
+
+    def set_image_metadata(self, source):
+        for name, value in image_metadata(source).items():
+            setattr(self, name, value)
+
+    def save(self, *args, **kwargs):
+        # Archivo nuevo (admin o API): se lee una vez antes de guardarlo en el storage.
+        if self.image and not self.image._committed:
+            self.image.seek(0)
+            self.set_image_metadata(self.image.read())
+            self.image.seek(0)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | set(self.METADATA_FIELDS)
+        super().save(*args, **kwargs)
+
 
 class PackageInclude(Timestamped):
     package = models.ForeignKey(
@@ -268,6 +308,25 @@ class PackageItinerary(Timestamped):
         ordering = ["day", "order", "id"]
 
 
+class PackageSearchTerm(models.Model):
+    # Índice invertido del buscador: lo mantiene turismo.search al guardar paquetes.
+    package = models.ForeignKey(
+        Package,
+        on_delete=models.CASCADE,
+        related_name="search_terms",
+        verbose_name="Paquete"
+    )
+    term = models.CharField("Término", max_length=60)
+    weight = models.PositiveSmallIntegerField("Peso", default=1)
+
+    class Meta:
+        verbose_name = "Término de búsqueda"
+        verbose_name_plural = "Términos de búsqueda"
+        constraints = [
+            models.UniqueConstraint(fields=["term", "package"], name="uniq_search_term_package"),
+        ]
+
+
 # ======================================================
 # RESERVAS
 # ======================================================
@@ -315,10 +374,57 @@ class Reservation(Timestamped):
         help_text="Código para que el cliente consulte su reserva"
     )
 
+    # Columnas de búsqueda para "mis reservas" (se llenan en save()).
+    email_normalized = models.CharField("Correo normalizado", max_length=254, editable=False, default="")
+    phone_digits = models.CharField("Teléfono (solo dígitos)", max_length=40, editable=False, default="")
+
     class Meta:
         verbose_name = "Reserva"
         verbose_name_plural = "Reservas"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["email_normalized", "phone_digits"], name="reservation_contact_idx"),
+        ]
+
+    def normalize_contact(self):
+        # bulk_create no llama a save(): quien cree en lote debe llamar a esto.
+        self.email_normalized = normalize_email(self.email)
+        self.phone_digits = normalize_phone(self.phone)
+
+    def save(self, *args, **kwargs):
+        self.normalize_contact()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"email", "phone"} & set(update_fields):
+            kwargs["update_fields"] = set(update_fields) | {"email_normalized", "phone_digits"}
+        super().save(*args, **kwargs)
+
+
+# ======================================================
+# CUPOS POR FECHA
+# ======================================================
+class PackageDateCapacity(models.Model):
+    # Asientos ocupados por reservas activas de un paquete en una fecha.
+    # El cupo total es Package.max_group (sin límite si está vacío).
+    package = models.ForeignKey(
+        Package,
+        on_delete=models.CASCADE,
+        related_name="date_capacities",
+        verbose_name="Paquete"
+    )
+    date = models.DateField("Fecha")
+    reserved = models.PositiveIntegerField("Asientos reservados", default=0)
+    updated_at = models.DateTimeField("Actualizado el", auto_now=True)
+
+    class Meta:
+        verbose_name = "Cupo por fecha"
+        verbose_name_plural = "Cupos por fecha"
+        ordering = ["package", "date"]
+        constraints = [
+            models.UniqueConstraint(fields=["package", "date"], name="uniq_package_date_capacity"),
+        ]
+
+    def __str__(self):
+        return f"{self.package} · {self.date} · {self.reserved}"
 
 
 # ======================================================
@@ -343,6 +449,9 @@ class Cart(Timestamped):
         verbose_name = "Carrito"
         verbose_name_plural = "Carritos"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "expires_at"], name="cart_status_expires_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.expires_at:
@@ -435,3 +544,114 @@ class PageView(Timestamped):
     class Meta:
         verbose_name = "Visita"
         verbose_name_plural = "Visitas"
+
+
+# ======================================================
+# AGREGADOS DE VISITAS (ROLLUPS)
+# ======================================================
+class PageViewDaily(models.Model):
+    date = models.DateField("Fecha")
+    path = models.CharField("Ruta", max_length=200)
+    total = models.PositiveIntegerField("Visitas", default=0)
+
+    class Meta:
+        verbose_name = "Visitas por día"
+        verbose_name_plural = "Visitas por día"
+        ordering = ["-date", "path"]
+        constraints = [
+            models.UniqueConstraint(fields=["date", "path"], name="uniq_pageview_daily"),
+        ]
+
+
+class PageViewMonthly(models.Model):
+    year = models.PositiveSmallIntegerField("Año")
+    month = models.PositiveSmallIntegerField("Mes")
+    path = models.CharField("Ruta", max_length=200)
+    total = models.PositiveIntegerField("Visitas", default=0)
+
+    class Meta:
+        verbose_name = "Visitas por mes"
+        verbose_name_plural = "Visitas por mes"
+        ordering = ["-year", "-month", "path"]
+        constraints = [
+            models.UniqueConstraint(fields=["year", "month", "path"], name="uniq_pageview_monthly"),
+        ]
+
+
+class RollupWatermark(models.Model):
+    name = models.CharField("Proceso", max_length=60, unique=True)
+    last_id = models.BigIntegerField("Último id procesado", default=0)
+    updated_at = models.DateTimeField("Actualizado el", auto_now=True)
+
+    class Meta:
+        verbose_name = "Marca de agregación"
+        verbose_name_plural = "Marcas de agregación"
+
+
+# ======================================================
+# PERFILES DE PETICIONES (DIAGNÓSTICO)
+# ======================================================
+class RequestProfile(Timestamped):
+    TRIGGER_CHOICES = [
+        ("header", "Encabezado X-Profile"),
+        ("sample", "Muestreo"),
+    ]
+
+    method = models.CharField("Método", max_length=10)
+    path = models.CharField("Ruta", max_length=255)
+    query_string = models.CharField("Parámetros", max_length=500, blank=True, default="")
+    view = models.CharField("Vista", max_length=150, blank=True, default="")
+    status_code = models.PositiveSmallIntegerField("Estado HTTP")
+    duration_ms = models.FloatField("Duración (ms)")
+    sql_count = models.PositiveIntegerField("Consultas SQL", default=0)
+    sql_ms = models.FloatField("Tiempo en SQL (ms)", default=0)
+    trigger = models.CharField("Origen", max_length=10, choices=TRIGGER_CHOICES)
+    user = models.ForeignKey(
+        "auth.User",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="request_profiles",
+        verbose_name="Usuario",
+    )
+    summary = models.TextField("Resumen del perfil", blank=True, default="")
+    sql_trace = models.JSONField("Traza SQL", default=list, blank=True)
+    raw_stats = models.BinaryField("Estadísticas (pstats)", blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Perfil de petición"
+        verbose_name_plural = "Perfiles de peticiones"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+
+# ======================================================
+# CONSULTAS LENTAS (AGREGADAS POR HUELLA)
+# ======================================================
+class SlowQuery(Timestamped):
+    fingerprint = models.CharField("Huella", max_length=32, unique=True)
+    sql = models.TextField("SQL normalizado")
+    count = models.PositiveBigIntegerField("Ejecuciones", default=0)
+    total_ms = models.FloatField("Tiempo total (ms)", default=0)
+    max_ms = models.FloatField("Máximo (ms)", default=0)
+    p95_ms = models.FloatField("p95 (ms)", default=0)
+    samples = models.JSONField("Muestras recientes (ms)", default=list, blank=True)
+    views = models.JSONField("Ejecuciones por vista", default=dict, blank=True)
+    last_view = models.CharField("Última vista", max_length=150, blank=True, default="")
+    last_seen = models.DateTimeField("Última vez")
+    explain = models.TextField("Plan (EXPLAIN)", blank=True, default="")
+    explained_at = models.DateTimeField("Plan obtenido el", blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Consulta lenta"
+        verbose_name_plural = "Consultas lentas"
+        ordering = ["-total_ms"]
+
+    def __str__(self):
+        return f"{self.fingerprint} ({self.count}x, p95 {self.p95_ms:.0f} ms)"
+
+    @property
+    def avg_ms(self):
+        return self.total_ms / self.count if self.count else 0
@@ -0,0 +1,175 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+# ======================================================
+# PAGINACIÓN POR CURSOR (KEYSET)
+# ======================================================
+# El cursor guarda los valores de TODAS las columnas del orden (siempre con
+# id al final) de la última fila vista, y la página siguiente filtra por la
+# tupla: (a > x) OR (a = x AND id > y). Nunca usa OFFSET ni COUNT(*): una
+# página profunda cuesta lo mismo que la primera, aunque muchas filas empaten
+# en la primera columna (todas las FAQ con order=0).
+# Los NULL se tratan como el valor más chico (así ordenan MySQL y SQLite).
+def _cursor_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class KeysetPagination(CursorPagination):
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        # Si la vista no define `ordering` ni llega ?ordering=, se respeta el
+        # orden declarado en el Meta del modelo (ej. "order", "id" en el contenido).
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering == tuple(self.ordering):
+            meta_ordering = tuple(queryset.model._meta.ordering or ())
+            if meta_ordering and all("__" not in f for f in meta_ordering):
+                ordering = meta_ordering
+        if not any(f.lstrip("-") in ("id", "pk") for f in ordering):
+            direction = "-" if ordering[0].startswith("-") else ""
+            ordering = ordering + (f"{direction}id",)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+        # Posición recibida y dirección: reverse = se pidió la página anterior.
+        self.cursor = self.decode_cursor(request)
+        position, reverse = self.cursor if self.cursor else (None, False)
+
+        ordering = [self._invert(f) for f in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if self.has_next or self.has_previous:
+            self.display_page_controls = True
+        return self.page
+
+    @staticmethod
+    def _invert(name):
+        return name[1:] if name.startswith("-") else f"-{name}"
+
+    def _after(self, ordering, position):
+        # (f1 > v1) OR (f1 = v1 AND f2 > v2) OR ... según la dirección de cada columna.
+        terms, equal = [], Q()
+        for name, value in zip(ordering, position):
+            field, descending = name.lstrip("-"), name.startswith("-")
+            if value is None:
+                # Nada es menor que NULL; "después de NULL" ascendente = no nulos.
+                if not descending:
+                    terms.append(equal & Q(**{f"{field}__isnull": False}))
+                equal &= Q(**{f"{field}__isnull": True})
+                continue
+            beyond = Q(**{f"{field}__{'lt' if descending else 'gt'}": value})
+            model_field = self._model_field(field)
+            if descending and model_field is not None and model_field.null:
+                beyond |= Q(**{f"{field}__isnull": True})
+            terms.append(equal & beyond)
+            equal &= Q(**{field: value})
+        condition = terms[0]
+        for term in terms[1:]:
+            condition |= term
+        return condition
+
+    def _model_field(self, name):
+        # None para "pk" y para anotaciones (ej. search_rank de la búsqueda).
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        return field if field.concrete else None
+
+    def _position(self, instance):
+        values = []
+        for name in self.ordering:
+            field = name.lstrip("-")
+            if isinstance(instance, dict):
+                value = instance[field]
+            else:
+                model_field = self._model_field(field)
+                value = getattr(instance, model_field.attname if model_field is not None else field)
+            values.append(_cursor_value(value))
+        return values
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            token = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            position, reverse = token["p"], bool(token.get("r"))
+            # Un cursor de otro ?ordering= no sirve para este.
+            if token["o"] != list(self.ordering) or len(position) != len(self.ordering):
+                raise ValueError
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse=False):
+        token = {"o": list(self.ordering), "p": position}
+        if reverse:
+            token["r"] = 1
+        encoded = urlsafe_b64encode(json.dumps(token, separators=(",", ":")).encode()).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[0]), reverse=True)
+
+
+class ContentPagination(KeysetPagination):
+    page_size = 50
+    max_page_size = 100
+
+
+class CatalogPagination(KeysetPagination):
+    page_size = 12
+    max_page_size = 48
+
+
+class AdminListPagination(KeysetPagination):
+    page_size = 25
+    max_page_size = 200
+
+
+class LookupPagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 50
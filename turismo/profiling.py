@@ -0,0 +1,175 @@
+import cProfile
+import io
+import logging
+import marshal
+import os
+import pstats
+import random
+import time
+import traceback
+
+from django.conf import settings
+from django.db import connection
+
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .metrics import view_name
+from .models import RequestProfile
+
+logger = logging.getLogger(__name__)
+
+
+# ======================================================
+# PERFILADO BAJO DEMANDA
+# ======================================================
+# Una petición se perfila si trae "X-Profile: 1" y la hace un admin (JWT o
+# sesión), o si cae en el muestreo SAMPLE_RATE. Se guarda en RequestProfile:
+# resumen de cProfile (top por tiempo acumulado), el pstats crudo para abrirlo
+# con snakeviz y la traza SQL (sin parámetros). Solo se conservan los últimos
+# MAX_PROFILES. Las peticiones no perfiladas solo pagan mirar un encabezado.
+DEFAULTS = {
+    "ENABLED": True,
+    "HEADER": "X-Profile",
+    "SAMPLE_RATE": 0.0,
+    "MAX_PROFILES": 200,
+    "TOP_FUNCTIONS": 40,
+    "MAX_SQL": 500,
+}
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+WRAPPER_MODULES = ("profiling.py", "metrics.py")
+
+
+def _options():
+    return {**DEFAULTS, **getattr(settings, "PROFILING", {})}
+
+
+def _staff_user(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user if user.is_staff else None
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except APIException:
+        return None
+    if authenticated and authenticated[0].is_staff:
+        return authenticated[0]
+    return None
+
+
+def _origin():
+    # Marco más interno del código de la app, sin contar los middlewares que envuelven las consultas.
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(APP_DIR) and os.path.basename(frame.filename) not in WRAPPER_MODULES:
+            return f"{os.path.relpath(frame.filename, APP_DIR)}:{frame.lineno} {frame.name}"
+    return ""
+
+
+class SQLTrace:
+    def __init__(self, start, limit):
+        self.start = start
+        self.limit = limit
+        self.entries = []
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        began = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - began
+            self.count += 1
+            self.seconds += elapsed
+            if len(self.entries) < self.limit:
+                self.entries.append({
+                    "at_ms": round((began - self.start) * 1000, 2),
+                    "ms": round(elapsed * 1000, 2),
+                    "sql": sql,
+                    "many": many,
+                    "origin": _origin(),
+                })
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = _options()
+        if not options["ENABLED"]:
+            return self.get_response(request)
+
+        trigger, user = None, None
+        if request.headers.get(options["HEADER"]) == "1":
+            user = _staff_user(request)
+            trigger = "header" if user else None
+        if trigger is None and options["SAMPLE_RATE"] and random.random() < options["SAMPLE_RATE"]:
+            trigger = "sample"
+        if trigger is None:
+            return self.get_response(request)
+
+        return self._profile(request, trigger, user, options)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._profiling_view = view_name(view_func, request.method)
+
+    def _profile(self, request, trigger, user, options):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Otro perfilador activo (otro hilo; desde 3.12 es por proceso): se atiende sin perfilar.
+            logger.info("Perfilador ocupado, %s se atiende sin perfilar", request.path)
+            return self.get_response(request)
+        start = time.perf_counter()
+        trace = SQLTrace(start, options["MAX_SQL"])
+        with connection.execute_wrapper(trace):
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - start
+
+        try:
+            profile = self._store(request, response, trigger, user, profiler, trace, duration, options)
+        except Exception:
+            logger.exception("No se pudo guardar el perfil de %s", request.path)
+            return response
+        response["X-Profile-Id"] = str(profile.pk)
+        return response
+
+    def _store(self, request, response, trigger, user, profiler, trace, duration, options):
+        summary = io.StringIO()
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats("cumulative").print_stats(options["TOP_FUNCTIONS"])
+        profiler.create_stats()
+
+        profile = RequestProfile.objects.create(
+            method=request.method,
+            path=request.path[:255],
+            query_string=request.META.get("QUERY_STRING", "")[:500],
+            view=getattr(request, "_profiling_view", "")[:150],
+            status_code=response.status_code,
+            duration_ms=duration * 1000,
+            sql_count=trace.count,
+            sql_ms=trace.seconds * 1000,
+            trigger=trigger,
+            user=user,
+            summary=summary.getvalue(),
+            sql_trace=trace.entries,
+            raw_stats=marshal.dumps(profiler.stats),
+        )
+        trim_profiles(options["MAX_PROFILES"])
+        return profile
+
+
+def trim_profiles(keep):
+    cutoff = (
+        RequestProfile.objects.order_by("-id")
+        .values_list("id", flat=True)[keep:keep + 1]
+        .first()
+    )
+    if cutoff is not None:
+        RequestProfile.objects.filter(id__lte=cutoff).delete()
@@ -0,0 +1,107 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+
+from rest_framework import serializers
+
+from .models import Package
+from .serializers import PackageSerializer
+
+
+# ======================================================
+# PLAN DE CONSULTAS A PARTIR DEL SERIALIZER
+# ======================================================
+# Recorre los campos (ya filtrados por ?fields= / ?expand=) y deriva:
+# - select_related para serializers anidados o fuentes "fk.campo" de un solo objeto;
+# - Prefetch con su propio queryset planificado para relaciones "many".
+# Los PrimaryKeyRelatedField no generan consultas (usan la columna *_id).
+def plan_queryset(queryset, serializer):
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    select, prefetch = [], []
+    _walk(queryset.model, serializer, "", select, prefetch)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+def _walk(model, serializer, prefix, select, prefetch):
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+
+        attrs = field.source_attrs
+        try:
+            model_field = model._meta.get_field(attrs[0])
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation:
+            continue
+
+        path = prefix + attrs[0]
+        if isinstance(field, serializers.ListSerializer):
+            if model_field.one_to_many or model_field.many_to_many:
+                related = model_field.related_model._default_manager.all()
+                prefetch.append(Prefetch(path, queryset=plan_queryset(related, field.child)))
+        elif model_field.many_to_one or model_field.one_to_one:
+            if isinstance(field, serializers.BaseSerializer):
+                select.append(path)
+                _walk(model_field.related_model, field, path + "__", select, prefetch)
+            elif len(attrs) > 1:
+                select.append(path)
+
+
+# ======================================================
+# PAQUETES "SIDE-LOADED" (?sideload=packages)
+# ======================================================
+# Cada fila devuelve solo el id en "package" y el paquete completo va una sola
+# vez en el mapa "packages" de la respuesta.
+def wants_package_sideload(request):
+    values = (request.query_params.get("sideload") or "").split(",")
+    return "packages" in {v.strip() for v in values}
+
+
+def _collect_package_ids(data, ids):
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == "package" and isinstance(value, int):
+                ids.add(value)
+            else:
+                _collect_package_ids(value, ids)
+    elif isinstance(data, list):
+        for value in data:
+            _collect_package_ids(value, ids)
+    return ids
+
+
+def sideloaded_packages(data, request):
+    ids = _collect_package_ids(data, set())
+    if not ids:
+        return {}
+    context = {"request": request}
+    packages = plan_queryset(Package.objects.filter(id__in=ids), PackageSerializer(context=context))
+    return {
+        str(package["id"]): package
+        for package in PackageSerializer(packages, many=True, context=context).data
+    }
+
+
+class PackageSideloadMixin:
+    def get_serializer_context(self):
+        ctx = super().get_serializer_context()
+        ctx["sideload_packages"] = wants_package_sideload(self.request)
+        return ctx
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if wants_package_sideload(self.request):
+            response.data["packages"] = sideloaded_packages(data, self.request)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        if wants_package_sideload(request):
+            response.data["packages"] = sideloaded_packages(response.data, request)
+        return response
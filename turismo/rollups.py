@@ -0,0 +1,102 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import PageView, PageViewDaily, PageViewMonthly, RollupWatermark
+
+
+# ======================================================
+# AGREGACIÓN INCREMENTAL DE VISITAS
+# ======================================================
+# Cada pasada procesa solo las visitas con id mayor a la marca guardada en
+# RollupWatermark y suma sus conteos en PageViewDaily / PageViewMonthly.
+# Se dejan fuera las visitas de los últimos LAG segundos para no saltar filas
+# de transacciones que todavía no confirmaron.
+WATERMARK_NAME = "pageviews"
+DEFAULT_BATCH_SIZE = 50000
+DEFAULT_LAG = timedelta(seconds=60)
+
+
+def _upsert(model, key_fields, deltas):
+    if not deltas:
+        return
+    lookup = {f"{field}__in": {key[i] for key in deltas} for i, field in enumerate(key_fields)}
+    existing = {
+        tuple(getattr(row, f) for f in key_fields): row
+        for row in model.objects.select_for_update().filter(**lookup)
+    }
+
+    to_update, to_create = [], []
+    for key, total in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            to_create.append(model(total=total, **dict(zip(key_fields, key))))
+        else:
+            row.total += total
+            to_update.append(row)
+
+    model.objects.bulk_update(to_update, ["total"], batch_size=1000)
+    model.objects.bulk_create(to_create, batch_size=1000)
+
+
+def _next_upper_id(last_id, batch_size, lag):
+    pending = (
+        PageView.objects
+        .filter(id__gt=last_id, created_at__lt=timezone.now() - lag)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    # Recorre solo el índice del PK: el id del último elemento del lote,
+    # o el máximo pendiente si queda menos de un lote.
+    upper = next(iter(pending[batch_size - 1:batch_size]), None)
+    if upper is None:
+        upper = pending.aggregate(upper=Max("id"))["upper"]
+    return upper
+
+
+def rollup_batch(batch_size=DEFAULT_BATCH_SIZE, lag=DEFAULT_LAG):
+    with transaction.atomic():
+        watermark, _ = RollupWatermark.objects.get_or_create(name=WATERMARK_NAME)
+        watermark = RollupWatermark.objects.select_for_update().get(pk=watermark.pk)
+
+        upper = _next_upper_id(watermark.last_id, batch_size, lag)
+        if upper is None:
+            return 0
+
+        rows = (
+            PageView.objects
+            .filter(id__gt=watermark.last_id, id__lte=upper)
+            .annotate(day=TruncDate("created_at"))
+            .values("day", "path")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+
+        daily, monthly = defaultdict(int), defaultdict(int)
+        processed = 0
+        for row in rows:
+            daily[(row["day"], row["path"])] += row["total"]
+            monthly[(row["day"].year, row["day"].month, row["path"])] += row["total"]
+            processed += row["total"]
+
+        _upsert(PageViewDaily, ("date", "path"), daily)
+        _upsert(PageViewMonthly, ("year", "month", "path"), monthly)
+
+        watermark.last_id = upper
+        watermark.save(update_fields=["last_id", "updated_at"])
+        return processed
+
+
+def rollup_pageviews(batch_size=DEFAULT_BATCH_SIZE, lag=DEFAULT_LAG, max_batches=None):
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        processed = rollup_batch(batch_size=batch_size, lag=lag)
+        if not processed:
+            break
+        total += processed
+        batches += 1
+    return total
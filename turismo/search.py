@@ -0,0 +1,191 @@
+import re
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Max, OuterRef, Q, Subquery, Sum, Value, When
+
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+from .models import Package, PackageSearchTerm
+
+
+# ======================================================
+# ANÁLISIS DE TEXTO (ESPAÑOL)
+# ======================================================
+STOPWORDS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes asi aun cada como con
+contra cual cuando de del desde donde dos e el ella ellas ellos en entre era eran
+es esa esas ese eso esos esta estan estas este esto estos fue fueron ha han hasta
+hay la las le les lo los mas me mi mis muy nada ni no nos o otra otras otro otros
+para pero poco por porque que quien se sea ser si sin sobre solo son su sus tambien
+te tiene tienen todo todos tu tus un una unas uno unos usted y ya
+""".split())
+
+# Peso de cada campo en el ranking.
+FIELD_WEIGHTS = (
+    ("title", 8),
+    ("category", 4),
+    ("short_description", 2),
+    ("description", 1),
+)
+
+MAX_QUERY_TERMS = 8
+TERM_MAX_LENGTH = 60
+
+_WORD_RE = re.compile(r"[a-z0-9ñ]+")
+
+
+def fold(text):
+    # Minúsculas y sin tildes ("Amazonía" -> "amazonia"); la ñ se conserva.
+    text = (text or "").lower().replace("ñ", "\x00")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return text.replace("\x00", "ñ")
+
+
+def stem(word):
+    # Stemmer ligero para español (J. Savoy): plurales y vocal de género.
+    if len(word) < 5:
+        return word
+    if word[-1] in "oae":
+        return word[:-1]
+    if word[-1] == "s":
+        if word.endswith("eses"):
+            return word[:-2]
+        if word.endswith("ces"):
+            return word[:-3] + "z"
+        if word[-2] in "oae":
+            return word[:-2]
+    return word
+
+
+def tokenize(text):
+    return [
+        stem(w)[:TERM_MAX_LENGTH]
+        for w in _WORD_RE.findall(fold(text))
+        if len(w) > 1 and w not in STOPWORDS
+    ]
+
+
+def build_terms(title="", category="", short_description="", description=""):
+    fields = {
+        "title": title,
+        "category": category,
+        "short_description": short_description,
+        "description": description,
+    }
+    terms = {}
+    for field, weight in FIELD_WEIGHTS:
+        for term in set(tokenize(fields[field])):
+            terms[term] = terms.get(term, 0) + weight
+    return terms
+
+
+# ======================================================
+# ÍNDICE INVERTIDO
+# ======================================================
+def index_package(package):
+    terms = build_terms(
+        title=package.title,
+        category=package.category.name if package.category_id else "",
+        short_description=package.short_description,
+        description=package.description,
+    )
+    with transaction.atomic():
+        PackageSearchTerm.objects.filter(package_id=package.pk).delete()
+        PackageSearchTerm.objects.bulk_create([
+            PackageSearchTerm(package_id=package.pk, term=term, weight=weight)
+            for term, weight in terms.items()
+        ])
+
+
+def reindex_packages(queryset=None, batch_size=500):
+    if queryset is None:
+        queryset = Package.objects.all()
+    total = 0
+    for package in queryset.select_related("category").iterator(chunk_size=batch_size):
+        index_package(package)
+        total += 1
+    return total
+
+
+# ======================================================
+# CONSULTA
+# ======================================================
+def parse_query(query):
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return [], None
+    # La última palabra se busca por prefijo: el buscador consulta mientras se escribe.
+    if query and not query[-1].isspace():
+        return terms[:-1], terms[-1]
+    return terms, None
+
+
+def search_packages(queryset, query):
+    exact, prefix = parse_query(query)
+    if not exact and not prefix:
+        return queryset.annotate(search_rank=Value(0, output_field=IntegerField()))
+
+    condition = Q(term__in=exact) if exact else Q()
+    hit_expressions = [
+        Max(Case(When(term=term, then=Value(1)), default=Value(0), output_field=IntegerField()))
+        for term in exact
+    ]
+    if prefix:
+        condition |= Q(term__startswith=prefix)
+        hit_expressions.append(
+            Max(Case(When(term__startswith=prefix, then=Value(1)), default=Value(0), output_field=IntegerField()))
+        )
+
+    hits = hit_expressions[0]
+    for expression in hit_expressions[1:]:
+        hits = hits + expression
+
+    # Solo se consulta la tabla de términos (índice term, package); nunca el TEXT de la descripción.
+    matches = (
+        PackageSearchTerm.objects
+        .filter(condition)
+        .values("package_id")
+        .annotate(rank=Sum("weight"), hits=hits)
+        .filter(hits=len(hit_expressions))
+    )
+    rank = matches.filter(package_id=OuterRef("pk")).values("rank")[:1]
+
+    return (
+        queryset
+        .filter(pk__in=matches.values("package_id"))
+        .annotate(search_rank=Subquery(rank, output_field=IntegerField()))
+    )
+
+
+class PackageSearchFilter(BaseFilterBackend):
+    search_param = "search"
+
+    def get_search_query(self, request):
+        # Consultas sin términos útiles (vacías o solo stopwords) no filtran.
+        query = request.query_params.get(self.search_param, "")
+        exact, prefix = parse_query(query)
+        return query if exact or prefix else ""
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_search_query(request)
+        if not query:
+            return queryset
+        return search_packages(queryset, query).order_by("-search_rank", "-id")
+
+    def get_ordering(self, request, queryset, view):
+        # La paginación por cursor toma el orden de aquí: por relevancia
+        # cuando hay búsqueda y no se pidió otro orden con ?ordering=.
+        if self.get_search_query(request) and not request.query_params.get(OrderingFilter.ordering_param):
+            return ("-search_rank", "-id")
+        return OrderingFilter().get_ordering(request, queryset, view)
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            "name": self.search_param,
+            "required": False,
+            "in": "query",
+            "description": "Búsqueda por texto (título, categoría, descripciones)",
+            "schema": {"type": "string"},
+        }]
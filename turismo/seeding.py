@@ -0,0 +1,461 @@
+import io
+import math
+import multiprocessing
+import random
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.core.files.base import ContentFile
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from .availability import rebuild_capacity_ledger
+from .cache import bump_version
+from .image_ops import image_metadata
+from .models import (
+    Cart, CartItem, Category, Package, PackageInclude, PackageItinerary,
+    PackagePhoto, PageView, Payment, Reservation,
+)
+from .search import reindex_packages
+
+
+# ======================================================
+# DATOS SINTÉTICOS A ESCALA (manage.py seed_scale)
+# ======================================================
+# Cada fila sale de un Random sembrado con (semilla, tabla, índice), y cada
+# tabla usa ids explícitos a partir del máximo actual: el resultado es el mismo
+# con 1 o N procesos y no hace falta releer PKs tras bulk_create (MySQL no los
+# devuelve). Las fases van en orden de FKs (paquetes, reservas, carritos,
+# visitas) y dentro de cada fase los bloques se reparten entre procesos.
+# Las reservas se reparten por paquete y fecha con un paso coprimo para no
+# sobrevender: el ledger de cupos se reconstruye al final.
+CHUNK_SIZE = {
+    "packages": 200,
+    "reservations": 10000,
+    "carts": 5000,
+    "pageviews": 50000,
+}
+ITEMS_PER_CART = 3
+IMAGE_POOL_SIZE = 12
+SLOT_STRIDE = 1000003
+
+CATEGORIES = ["Selva", "Ríos y lagos", "Aventura", "Observación de fauna", "Comunidades nativas", "Relax"]
+PLACES = [
+    "Tambopata", "Manu", "Pacaya Samiria", "Iquitos", "Madre de Dios", "Oxapampa",
+    "Lago Sandoval", "Río Amazonas", "Puerto Maldonado", "Tarapoto", "Chachapoyas", "Pozuzo",
+]
+ACTIVITIES = [
+    "Caminata por la selva", "Canopy", "Avistamiento de aves", "Pesca artesanal", "Kayak",
+    "Navegación nocturna", "Visita a collpa de guacamayos", "Expedición fotográfica",
+    "Ruta de cascadas", "Convivencia con comunidades", "Observación de delfines rosados",
+]
+ADJECTIVES = ["inolvidable", "clásica", "profunda", "salvaje", "familiar", "premium", "express", "de lujo"]
+INCLUDES = [
+    "Traslados aeropuerto - hotel", "Guía bilingüe", "Alimentación completa", "Alojamiento en lodge",
+    "Entradas a reservas", "Botas de caucho", "Seguro de viaje", "Bote con motor", "Agua y snacks",
+]
+FIRST_NAMES = ["Ana", "Luis", "María", "Carlos", "Lucía", "Jorge", "Valeria", "Diego", "Camila", "Mateo", "Sofía", "Pedro"]
+LAST_NAMES = ["Quispe", "Flores", "García", "Rojas", "Huamán", "Torres", "Vargas", "Castillo", "Mendoza", "Ramírez"]
+NATIONALITIES = ["Perú", "Chile", "Argentina", "Colombia", "México", "España", "Estados Unidos", "Alemania", "Francia", "Brasil"]
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/124.0 Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 Version/17.4 Mobile Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 Chrome/124.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_4) AppleWebKit/605.1.15 Version/17.4 Safari/605.1.15",
+]
+STATIC_PATHS = ["/", "/paquetes", "/nosotros", "/contacto", "/preguntas-frecuentes", "/carrito"]
+
+# Estado del carrito -> (peso, estado de sus reservas, estado del pago o None).
+CART_OUTCOMES = {
+    "PAGADO": (45, "CONFIRMADO", "APROBADO"),
+    "EXPIRADO": (35, "CANCELADO", None),
+    "CANCELADO": (5, "CANCELADO", "RECHAZADO"),
+    "ABIERTO": (15, "PENDIENTE", None),
+}
+RESERVATION_STATUS_WEIGHTS = {"PENDIENTE": 15, "CONTACTADO": 15, "CONFIRMADO": 55, "CANCELADO": 15}
+
+TIMESTAMPED_MODELS = (
+    Package, PackagePhoto, PackageInclude, PackageItinerary,
+    Reservation, Cart, CartItem, Payment, PageView,
+)
+
+
+def _rng(seed, kind, index):
+    return random.Random(f"{seed}:{kind}:{index}")
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _moment(rng, start, days):
+    return start + timedelta(seconds=rng.randrange(max(days, 1) * 86400))
+
+
+@contextmanager
+def historical_timestamps(models=TIMESTAMPED_MODELS):
+    # bulk_create respeta created_at/updated_at solo si no son auto_now(_add).
+    fields = [model._meta.get_field(name) for model in models for name in ("created_at", "updated_at")]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+# ======================================================
+# IMÁGENES
+# ======================================================
+def build_image_pool(seed, size=IMAGE_POOL_SIZE):
+    """Genera unas pocas fotos (degradados) y devuelve sus nombres y metadatos en el storage."""
+    storage = PackagePhoto._meta.get_field("image").storage
+    pool = []
+    for index in range(size):
+        rng = _rng(seed, "image", index)
+        top = tuple(rng.randrange(256) for _ in range(3))
+        bottom = tuple(rng.randrange(256) for _ in range(3))
+        image = Image.new("RGB", (1200, 800))
+        draw = ImageDraw.Draw(image)
+        for y in range(800):
+            mix = y / 799
+            draw.line([(0, y), (1199, y)], fill=tuple(int(a + (b - a) * mix) for a, b in zip(top, bottom)))
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=80)
+        content = buffer.getvalue()
+        name = storage.save(f"packages/photos/seed-{index}.jpg", ContentFile(content))
+        pool.append((name, image_metadata(content)))
+    return pool
+
+
+# ======================================================
+# GENERADORES POR BLOQUE
+# ======================================================
+def _seed_packages(ctx, start, count):
+    packages, photos, includes, itinerary = [], [], [], []
+    for index in range(start, start + count):
+        rng = _rng(ctx["seed"], "package", index)
+        pk = ctx["ids"]["package"] + index
+        created = _moment(rng, ctx["since"], ctx["days"])
+        place, activity = rng.choice(PLACES), rng.choice(ACTIVITIES)
+        duration = rng.randint(1, 7)
+        cover_name, _ = rng.choice(ctx["images"])
+        packages.append(Package(
+            id=pk,
+            category_id=rng.choice(ctx["categories"]),
+            title=f"{activity} en {place} {rng.choice(ADJECTIVES)}"[:160],
+            slug=f"{ctx['slug_prefix']}{index}",
+            short_description=f"{activity} y {rng.choice(ACTIVITIES).lower()} en {place}, {duration} días."[:260],
+            description=" ".join(
+                f"Día {day}: {rng.choice(ACTIVITIES)} cerca de {rng.choice(PLACES)}." for day in range(1, duration + 1)
+            ),
+            cover=cover_name,
+            price_from=Decimal(rng.randrange(8000, 250000)) / 100,
+            currency=rng.choice(["USD", "USD", "PEN"]),
+            duration_days=duration,
+            difficulty=rng.choice(["FACIL", "MODERADA", "DIFICIL"]),
+            max_group=None if rng.random() < 0.05 else rng.randint(6, 20),
+            activities_count=rng.randint(2, 12),
+            is_popular=rng.random() < 0.2,
+            is_featured=rng.random() < 0.1,
+            is_active=rng.random() < 0.95,
+            created_at=created,
+            updated_at=created,
+        ))
+        base = index * 8
+        for order in range(rng.randint(3, 8)):
+            name, meta = rng.choice(ctx["images"])
+            photos.append(PackagePhoto(
+                id=ctx["ids"]["photo"] + base + order, package_id=pk, image=name, order=order,
+                created_at=created, updated_at=created, **meta,
+            ))
+        for order, text in enumerate(rng.sample(INCLUDES, rng.randint(3, 6))):
+            includes.append(PackageInclude(
+                id=ctx["ids"]["include"] + base + order, package_id=pk, text=text, order=order,
+                created_at=created, updated_at=created,
+            ))
+        for day in range(1, min(duration, 8) + 1):
+            itinerary.append(PackageItinerary(
+                id=ctx["ids"]["itinerary"] + base + day - 1, package_id=pk, day=day, order=day,
+                title=f"{rng.choice(ACTIVITIES)} en {rng.choice(PLACES)}"[:160],
+                detail=f"Salida temprano hacia {rng.choice(PLACES)}. {rng.choice(ACTIVITIES)} y retorno al lodge.",
+                created_at=created, updated_at=created,
+            ))
+
+    batch_size = ctx["batch_size"]
+    with transaction.atomic():
+        Package.objects.bulk_create(packages, batch_size=batch_size)
+        PackagePhoto.objects.bulk_create(photos, batch_size=batch_size)
+        PackageInclude.objects.bulk_create(includes, batch_size=batch_size)
+        PackageItinerary.objects.bulk_create(itinerary, batch_size=batch_size)
+    return len(packages)
+
+
+def _reservation(ctx, rng, pk, sequence, status):
+    # Paso coprimo: las reservas recorren todas las (paquete, fecha) antes de repetir una.
+    slot = (sequence * ctx["stride"]) % ctx["slots"]
+    package_id, price, currency = ctx["packages"][slot // ctx["travel_days"]]
+    travel_date = ctx["first_travel_date"] + timedelta(days=slot % ctx["travel_days"])
+    adults, children = rng.randint(1, 3), rng.choice([0, 0, 0, 1, 2])
+    created = timezone.make_aware(datetime.combine(travel_date, dt_time())) - timedelta(
+        days=rng.randint(2, 120), seconds=rng.randrange(86400)
+    )
+    created = min(created, ctx["now"])
+    customer = rng.randrange(ctx["customers"])
+    reservation = Reservation(
+        id=pk,
+        package_id=package_id,
+        full_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        email=f"cliente{customer}@ejemplo.com",
+        phone=f"+51 9{customer % 100000000:08d}",
+        nationality=rng.choice(NATIONALITIES),
+        travel_date=travel_date,
+        adults=adults,
+        children=children,
+        status=status,
+        total_amount=price * (adults + children),
+        currency=currency,
+        public_code=f"{rng.getrandbits(64):016x}",
+        created_at=created,
+        updated_at=created,
+    )
+    reservation.normalize_contact()
+    return reservation
+
+
+def _seed_reservations(ctx, start, count):
+    reservations = []
+    for index in range(start, start + count):
+        rng = _rng(ctx["seed"], "reservation", index)
+        status = _weighted(rng, RESERVATION_STATUS_WEIGHTS)
+        reservations.append(_reservation(ctx, rng, ctx["ids"]["reservation"] + index, index, status))
+    with transaction.atomic():
+        Reservation.objects.bulk_create(reservations, batch_size=ctx["batch_size"])
+    return len(reservations)
+
+
+def _seed_carts(ctx, start, count):
+    carts, reservations, items, payments = [], [], [], []
+    weights = {status: outcome[0] for status, outcome in CART_OUTCOMES.items()}
+    for index in range(start, start + count):
+        rng = _rng(ctx["seed"], "cart", index)
+        status = _weighted(rng, weights)
+        _, reservation_status, payment_status = CART_OUTCOMES[status]
+        if status == "ABIERTO":
+            created = ctx["now"] - timedelta(seconds=rng.randrange(2 * 86400))
+        else:
+            created = _moment(rng, ctx["since"], ctx["days"])
+        cart_id = ctx["ids"]["cart"] + index
+        customer = rng.randrange(ctx["customers"])
+        carts.append(Cart(
+            id=cart_id,
+            email=f"cliente{customer}@ejemplo.com",
+            phone=f"+51 9{customer % 100000000:08d}",
+            nationality=rng.choice(NATIONALITIES),
+            status=status,
+            expires_at=created + timedelta(days=3),
+            created_at=created,
+            updated_at=created,
+        ))
+
+        total = Decimal("0")
+        for slot in range(rng.randint(1, ITEMS_PER_CART)):
+            offset = index * ITEMS_PER_CART + slot
+            reservation = _reservation(
+                ctx, rng, ctx["ids"]["cart_reservation"] + offset, ctx["reservations"] + offset, reservation_status
+            )
+            reservations.append(reservation)
+            items.append(CartItem(
+                id=ctx["ids"]["item"] + offset,
+                cart_id=cart_id,
+                package_id=reservation.package_id,
+                reservation_id=reservation.id,
+                travel_date=reservation.travel_date,
+                adults=reservation.adults,
+                children=reservation.children,
+                unit_price=reservation.total_amount / (reservation.adults + reservation.children),
+                currency=reservation.currency,
+                created_at=created,
+                updated_at=created,
+            ))
+            total += reservation.total_amount
+
+        if payment_status:
+            payments.append(Payment(
+                id=ctx["ids"]["payment"] + index,
+                cart_id=cart_id,
+                amount=total,
+                currency=items[-1].currency,
+                status=payment_status,
+                reference=str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                created_at=created,
+                updated_at=created,
+            ))
+
+    batch_size = ctx["batch_size"]
+    with transaction.atomic():
+        Cart.objects.bulk_create(carts, batch_size=batch_size)
+        Reservation.objects.bulk_create(reservations, batch_size=batch_size)
+        CartItem.objects.bulk_create(items, batch_size=batch_size)
+        Payment.objects.bulk_create(payments, batch_size=batch_size)
+    return len(carts)
+
+
+def _seed_pageviews(ctx, start, count):
+    rng = _rng(ctx["seed"], "pageviews", start)
+    slugs = ctx["slugs"]
+    views = []
+    for index in range(start, start + count):
+        if slugs and rng.random() < 0.6:
+            path = f"/paquetes/{rng.choice(slugs)}"
+        else:
+            path = rng.choice(STATIC_PATHS)
+        created = _moment(rng, ctx["since"], ctx["days"])
+        views.append(PageView(
+            id=ctx["ids"]["pageview"] + index,
+            path=path,
+            ip=f"{rng.randint(1, 223)}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randint(1, 254)}",
+            user_agent=rng.choice(USER_AGENTS),
+            country=rng.choice(NATIONALITIES),
+            created_at=created,
+            updated_at=created,
+        ))
+    with transaction.atomic():
+        PageView.objects.bulk_create(views, batch_size=ctx["batch_size"])
+    return len(views)
+
+
+PHASES = {
+    "packages": _seed_packages,
+    "reservations": _seed_reservations,
+    "carts": _seed_carts,
+    "pageviews": _seed_pageviews,
+}
+
+
+def _run_chunk(phase, ctx, start, count):
+    with historical_timestamps():
+        return PHASES[phase](ctx, start, count)
+
+
+# ======================================================
+# ORQUESTACIÓN
+# ======================================================
+def _next_id(model):
+    return (model.objects.aggregate(top=Max("id"))["top"] or 0) + 1
+
+
+def _coprime_stride(slots):
+    stride = SLOT_STRIDE
+    while math.gcd(stride, slots) != 1:
+        stride += 1
+    return stride
+
+
+class ScaleSeeder:
+    def __init__(self, seed=42, packages=2000, reservations=200000, carts=100000, pageviews=1000000,
+                 days=365, until=None, batch_size=2000, workers=1, log=print):
+        self.seed = seed
+        # Las fechas se calculan desde las 00:00 de "until" (hoy por defecto) para que
+        # la misma semilla y el mismo día den exactamente las mismas filas.
+        self.until = until or timezone.localdate()
+        self.counts = {"packages": packages, "reservations": reservations, "carts": carts, "pageviews": pageviews}
+        self.days = days
+        self.batch_size = batch_size
+        # SQLite no admite escritores concurrentes: ahí siempre un solo proceso.
+        self.workers = 1 if connection.vendor == "sqlite" else max(1, workers)
+        self.log = log
+
+    def slug_prefix(self):
+        return f"seed{self.seed}-"
+
+    def run(self):
+        if Package.objects.filter(slug__startswith=self.slug_prefix()).exists():
+            raise ValueError(f"Ya hay datos generados con la semilla {self.seed}.")
+
+        now = timezone.make_aware(datetime.combine(self.until, dt_time()))
+        ctx = {
+            "seed": self.seed,
+            "batch_size": self.batch_size,
+            "days": self.days,
+            "now": now,
+            "since": now - timedelta(days=self.days),
+            "slug_prefix": self.slug_prefix(),
+            "reservations": self.counts["reservations"],
+            "customers": max(1, (self.counts["reservations"] + self.counts["carts"]) // 3),
+            "categories": [
+                Category.objects.get_or_create(name=name)[0].pk for name in CATEGORIES
+            ],
+            "images": build_image_pool(self.seed) if self.counts["packages"] else [],
+            "ids": {
+                "package": _next_id(Package),
+                # 8 filas hijas reservadas por paquete (fotos, incluye, itinerario).
+                "photo": _next_id(PackagePhoto),
+                "include": _next_id(PackageInclude),
+                "itinerary": _next_id(PackageItinerary),
+                "cart": _next_id(Cart),
+                "item": _next_id(CartItem),
+                "payment": _next_id(Payment),
+                "pageview": _next_id(PageView),
+            },
+        }
+        ctx["ids"]["reservation"] = _next_id(Reservation)
+        ctx["ids"]["cart_reservation"] = ctx["ids"]["reservation"] + self.counts["reservations"]
+
+        totals = {}
+        totals["packages"] = self._phase("packages", ctx)
+
+        rows = list(
+            Package.objects.filter(is_active=True).order_by("id").values_list("id", "price_from", "currency", "slug")
+        )
+        ctx["packages"] = [(pk, price, currency) for pk, price, currency, _ in rows]
+        ctx["slugs"] = [slug for *_, slug in rows]
+        if (self.counts["reservations"] or self.counts["carts"]) and not rows:
+            raise ValueError("No hay paquetes activos para generar reservas.")
+        ctx["travel_days"] = self.days
+        ctx["first_travel_date"] = now.date() - timedelta(days=self.days // 2)
+        ctx["slots"] = max(len(rows) * self.days, 1)
+        ctx["stride"] = _coprime_stride(ctx["slots"])
+
+        for phase in ("reservations", "carts", "pageviews"):
+            totals[phase] = self._phase(phase, ctx)
+
+        started = time.monotonic()
+        seeded = Package.objects.filter(slug__startswith=self.slug_prefix())
+        indexed = reindex_packages(seeded)
+        dates = rebuild_capacity_ledger()
+        for model in (Category, Package, PackagePhoto, PackageInclude, PackageItinerary):
+            bump_version(model)
+        self.log(f"índice de búsqueda ({indexed} paquetes) y cupos ({dates} fechas) en {time.monotonic() - started:.1f}s")
+        return totals
+
+    def _phase(self, phase, ctx):
+        total = self.counts[phase]
+        if not total:
+            return 0
+        size = CHUNK_SIZE[phase]
+        chunks = [(start, min(size, total - start)) for start in range(0, total, size)]
+        started = time.monotonic()
+        if self.workers == 1:
+            done = sum(_run_chunk(phase, ctx, start, count) for start, count in chunks)
+        else:
+            # Los hijos abren sus propias conexiones: no heredar las del padre.
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("fork")
+            ) as executor:
+                done = sum(executor.map(
+                    _run_chunk, [phase] * len(chunks), [ctx] * len(chunks),
+                    [start for start, _ in chunks], [count for _, count in chunks],
+                ))
+        elapsed = time.monotonic() - started
+        self.log(f"{phase}: {done} en {elapsed:.1f}s ({done / max(elapsed, 0.001):.0f}/s)")
+        return done
@@ -1,4 +1,6 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
+from .image_ops import FORMATS
 from .models import (
     SiteInfo, HeroSlide, Service, AboutBlock, ValueItem, TeamMember,
     Certification, KPI, Faq, Testimonial,
@@ -7,6 +9,61 @@ from .models import (
     Cart, CartItem, Payment
 )
 
+
+# ======================================================
+# CAMPOS DISPERSOS (?fields= / ?expand=)
+# ======================================================
+def parse_csv_param(value):
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+
+class SparseFieldsetMixin:
+    # Relaciones anidadas opcionales: nombre -> (serializer, kwargs).
+    expandable_fields = {}
+    default_expand = ()
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if expand is None:
+            # Con ?fields= las relaciones por defecto solo entran si se pidieron.
+            expand = [name for name in self.default_expand if not fields or name in fields]
+        for name in expand:
+            if name in self.expandable_fields:
+                serializer_class, field_kwargs = self.expandable_fields[name]
+                self.fields[name] = serializer_class(read_only=True, **field_kwargs)
+
+        if fields:
+            keep = set(fields) | set(expand)
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+
+
+# ======================================================
+# VARIANTES DE IMÁGENES
+# ======================================================
+def build_variant_urls(request, variants):
+    # {"thumb": {"width", "height", "webp", "jpeg"}, ..., "srcset": {"webp": "url 320w, ...", ...}}
+    entries = sorted(
+        ((name, entry) for name, entry in (variants or {}).items() if isinstance(entry, dict)),
+        key=lambda item: item[1]["width"],
+    )
+    if not entries:
+        return None
+
+    result, srcset = {}, {ext: [] for ext in FORMATS}
+    for name, entry in entries:
+        urls = {"width": entry["width"], "height": entry["height"]}
+        for ext in FORMATS:
+            url = default_storage.url(entry[ext])
+            urls[ext] = request.build_absolute_uri(url) if request else url
+            srcset[ext].append(f"{urls[ext]} {entry['width']}w")
+        result[name] = urls
+    result["srcset"] = {ext: ", ".join(items) for ext, items in srcset.items()}
+    return result
+
+
 # ======================================================
 # CONFIGURACIÓN DEL SITIO
 # ======================================================
@@ -18,6 +75,7 @@ class SiteInfoSerializer(serializers.ModelSerializer):
 
 class HeroSlideSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = HeroSlide
@@ -31,6 +89,9 @@ class HeroSlideSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_image_variants(self, obj):
+        return build_variant_urls(self.context.get("request"), obj.image_variants)
+
 
 class ServiceSerializer(serializers.ModelSerializer):
     class Meta:
@@ -43,6 +104,7 @@ class ServiceSerializer(serializers.ModelSerializer):
 # ======================================================
 class AboutBlockSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = AboutBlock
@@ -56,6 +118,9 @@ class AboutBlockSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_image_variants(self, obj):
+        return build_variant_urls(self.context.get("request"), obj.image_variants)
+
 
 class ValueItemSerializer(serializers.ModelSerializer):
     class Meta:
@@ -65,6 +130,7 @@ class ValueItemSerializer(serializers.ModelSerializer):
 
 class TeamMemberSerializer(serializers.ModelSerializer):
     avatar_url = serializers.SerializerMethodField()
+    avatar_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = TeamMember
@@ -78,6 +144,9 @@ class TeamMemberSerializer(serializers.ModelSerializer):
             return obj.avatar.url
         return None
 
+    def get_avatar_variants(self, obj):
+        return build_variant_urls(self.context.get("request"), obj.avatar_variants)
+
 
 class CertificationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -114,6 +183,7 @@ class CategorySerializer(serializers.ModelSerializer):
 
 class PackagePhotoSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = PackagePhoto
@@ -127,6 +197,9 @@ class PackagePhotoSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_image_variants(self, obj):
+        return build_variant_urls(self.context.get("request"), obj.image_variants)
+
 
 class PackageIncludeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -140,8 +213,18 @@ class PackageItinerarySerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class PackageSerializer(serializers.ModelSerializer):
-    category = CategorySerializer(read_only=True)
+PACKAGE_EXPANDABLE_FIELDS = {
+    "category": (CategorySerializer, {}),
+    "photos": (PackagePhotoSerializer, {"many": True}),
+    "includes": (PackageIncludeSerializer, {"many": True}),
+    "itinerary": (PackageItinerarySerializer, {"many": True}),
+}
+
+
+class PackageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = PACKAGE_EXPANDABLE_FIELDS
+    default_expand = tuple(PACKAGE_EXPANDABLE_FIELDS)
+
     category_id = serializers.PrimaryKeyRelatedField(
         source="category",
         queryset=Category.objects.all(),
@@ -149,13 +232,11 @@ class PackageSerializer(serializers.ModelSerializer):
     )
 
     cover_url = serializers.SerializerMethodField()
-    photos = PackagePhotoSerializer(many=True, read_only=True)
-    includes = PackageIncludeSerializer(many=True, read_only=True)
-    itinerary = PackageItinerarySerializer(many=True, read_only=True)
+    cover_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Package
-        fields = "__all__"
+        exclude = ("category",)
 
     def get_cover_url(self, obj):
         request = self.context.get("request")
@@ -165,11 +246,45 @@ class PackageSerializer(serializers.ModelSerializer):
             return obj.cover.url
         return None
 
+    def get_cover_variants(self, obj):
+        return build_variant_urls(self.context.get("request"), obj.cover_variants)
+
+
+class PackageCardSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # Representación compacta para listados (tarjetas del catálogo).
+    expandable_fields = PACKAGE_EXPANDABLE_FIELDS
+
+    category_id = serializers.IntegerField(read_only=True)
+    category_name = serializers.CharField(source="category.name", read_only=True)
+    cover_url = serializers.SerializerMethodField()
+    cover_variants = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Package
+        fields = (
+            "id", "slug", "title", "short_description", "cover_url", "cover_variants",
+            "price_from", "currency", "duration_days", "difficulty",
+            "max_group", "activities_count", "is_popular", "is_featured",
+            "is_active", "category_id", "category_name",
+        )
+
+    get_cover_url = PackageSerializer.get_cover_url
+    get_cover_variants = PackageSerializer.get_cover_variants
+
+
+class PackageSideloadSerializerMixin:
+    # Con ?sideload=packages el paquete anidado se reemplaza por su id.
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get("sideload_packages") and "package" in fields:
+            fields["package"] = serializers.PrimaryKeyRelatedField(read_only=True)
+        return fields
+
 
 # ======================================================
 # RESERVAS
 # ======================================================
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(PackageSideloadSerializerMixin, serializers.ModelSerializer):
     package = PackageSerializer(read_only=True)
     package_id = serializers.PrimaryKeyRelatedField(
         source="package",
@@ -179,7 +294,7 @@ class ReservationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Reservation
-        fields = "__all__"
+        exclude = ("email_normalized", "phone_digits")
         read_only_fields = (
             "public_code",
             "created_at",
@@ -190,7 +305,7 @@ class ReservationSerializer(serializers.ModelSerializer):
 # ======================================================
 # CARRITO / ITEMS / PAGO (SIMULADO)
 # ======================================================
-class CartItemSerializer(serializers.ModelSerializer):
+class CartItemSerializer(PackageSideloadSerializerMixin, serializers.ModelSerializer):
     package = PackageSerializer(read_only=True)
     package_id = serializers.PrimaryKeyRelatedField(
         source="package",
@@ -212,6 +327,19 @@ class CartItemSerializer(serializers.ModelSerializer):
             return None
 
 
+class CartItemInputSerializer(serializers.Serializer):
+    # Entrada de add_items: un item por paquete/fecha.
+    package_id = serializers.IntegerField()
+    full_name = serializers.CharField(max_length=140)
+    email = serializers.EmailField(required=False, allow_blank=True)
+    phone = serializers.CharField(max_length=40, required=False, allow_blank=True, allow_null=True)
+    nationality = serializers.CharField(max_length=80, required=False, allow_blank=True, allow_null=True)
+    travel_date = serializers.DateField(required=False, allow_null=True)
+    adults = serializers.IntegerField(min_value=0, default=1)
+    children = serializers.IntegerField(min_value=0, default=0)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
 class CartSerializer(serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
 
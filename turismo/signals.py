@@ -0,0 +1,83 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_version
+from .derivatives import IMAGE_FIELDS, image_pipeline
+from .models import (
+    SiteInfo, HeroSlide, Service, AboutBlock, ValueItem, TeamMember,
+    Certification, KPI, Faq, Testimonial,
+    Category, Package, PackagePhoto, PackageInclude, PackageItinerary
+)
+from .search import index_package, reindex_packages
+from .slowqueries import install_slow_query_wrapper
+
+
+# ======================================================
+# ÍNDICE DE BÚSQUEDA
+# ======================================================
+# Al borrar un paquete sus términos se eliminan por CASCADE.
+@receiver(post_save, sender=Package)
+def reindex_package_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_package(instance)
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_name(sender, instance, raw=False, **kwargs):
+    if raw or not instance.pk:
+        return
+    instance._previous_name = (
+        Category.objects.filter(pk=instance.pk).values_list("name", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_packages(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    if getattr(instance, "_previous_name", None) != instance.name:
+        reindex_packages(instance.packages.all())
+
+
+# ======================================================
+# VERSIONES DE CACHÉ
+# ======================================================
+CACHED_MODELS = (
+    SiteInfo, HeroSlide, Service, AboutBlock, ValueItem, TeamMember,
+    Certification, KPI, Faq, Testimonial,
+    Category, Package, PackagePhoto, PackageInclude, PackageItinerary,
+)
+
+
+def bump_cache_version(sender, using=None, **kwargs):
+    # Recién al confirmar: antes, un lector podría guardar filas viejas bajo la versión nueva.
+    transaction.on_commit(lambda: bump_version(sender), using=using)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(bump_cache_version, sender=model, dispatch_uid=f"cache-version-save-{model.__name__}")
+    post_delete.connect(bump_cache_version, sender=model, dispatch_uid=f"cache-version-delete-{model.__name__}")
+
+
+# ======================================================
+# VARIANTES DE IMÁGENES
+# ======================================================
+def schedule_image_variants(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    image_pipeline.schedule(instance)
+
+
+for model in IMAGE_FIELDS:
+    post_save.connect(schedule_image_variants, sender=model, dispatch_uid=f"image-variants-{model.__name__}")
+
+
+# ======================================================
+# CONSULTAS LENTAS
+# ======================================================
+@receiver(connection_created)
+def track_slow_queries(sender, connection, **kwargs):
+    install_slow_query_wrapper(connection)
@@ -0,0 +1,244 @@
+import atexit
+import contextvars
+import hashlib
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+
+from .metrics import view_name
+from .models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+
+# ======================================================
+# REGISTRO DE CONSULTAS LENTAS
+# ======================================================
+# Un execute_wrapper (instalado en cada conexión con connection_created, ver
+# signals.py) mide cada consulta; las que pasan THRESHOLD_MS se agrupan en
+# memoria por huella (SQL sin literales ni listas IN) junto con la vista que
+# las lanzó. Un hilo de fondo las vuelca a SlowQuery cada FLUSH_INTERVAL:
+# conteo, total, máximo, p95 sobre las últimas SAMPLE_SIZE muestras, y un
+# EXPLAIN de la consulta de ejemplo la primera vez y luego con probabilidad
+# EXPLAIN_SAMPLE_RATE. Los parámetros solo se usan para el EXPLAIN, no se guardan.
+DEFAULTS = {
+    "ENABLED": True,
+    "THRESHOLD_MS": 100,
+    "FLUSH_INTERVAL": 30.0,
+    "SAMPLE_SIZE": 200,
+    "EXPLAIN_SAMPLE_RATE": 0.1,
+    "MAX_FINGERPRINTS": 1000,
+}
+
+EXPLAIN_PREFIX = {
+    "mysql": "EXPLAIN ",
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+VIEW_MAX_LENGTH = SlowQuery._meta.get_field("last_view").max_length
+
+current_view = contextvars.ContextVar("slow_query_view", default="")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))+\s*\)")
+_ROWS = re.compile(r"(\([^()]*\))(?:\s*,\s*\1)+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    sql = _ROWS.sub(r"\1, ...", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.md5(normalized.encode()).hexdigest()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class SlowQueryLog:
+    def __init__(self, options=None):
+        self.options = {**DEFAULTS, **(options or {})}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # Las consultas del propio volcado no se registran.
+        self._local = threading.local()
+        self._start()
+
+    def _start(self):
+        # Tras un fork (gunicorn --preload) los pendientes y el hilo no se heredan.
+        self._pid = os.getpid()
+        self._pending = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _ensure_running(self):
+        if self._pid != os.getpid():
+            self._start()
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="slow-query-flusher", daemon=True)
+                    self._thread.start()
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(self._local, "suppressed", False):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if elapsed_ms >= self.options["THRESHOLD_MS"]:
+                self.record(sql, params, many, elapsed_ms, context["connection"].alias)
+
+    def record(self, sql, params, many, elapsed_ms, alias):
+        self._ensure_running()
+        normalized = normalize_sql(sql)
+        key = fingerprint(normalized)
+        view = current_view.get() or ""
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                if len(self._pending) >= self.options["MAX_FINGERPRINTS"]:
+                    return
+                entry = self._pending[key] = {
+                    "sql": normalized, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "samples": [], "views": {}, "last_view": "", "example": None,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["samples"] = (entry["samples"] + [round(elapsed_ms, 2)])[-self.options["SAMPLE_SIZE"]:]
+            entry["views"][view] = entry["views"].get(view, 0) + 1
+            entry["last_view"] = view
+            if not many:
+                entry["example"] = (alias, sql, params)
+
+    def _run(self):
+        self._local.suppressed = True
+        while not self._stop.is_set():
+            self._wake.wait(self.options["FLUSH_INTERVAL"])
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        suppressed = getattr(self._local, "suppressed", False)
+        self._local.suppressed = True
+        with self._flush_lock:
+            close_old_connections()
+            try:
+                for key, entry in pending.items():
+                    try:
+                        self._save(key, entry)
+                    except Exception:
+                        logger.exception("No se pudo guardar la consulta lenta %s", key)
+            finally:
+                close_old_connections()
+                self._local.suppressed = suppressed
+        return len(pending)
+
+    def _save(self, key, entry):
+        now = timezone.now()
+        with transaction.atomic():
+            SlowQuery.objects.get_or_create(
+                fingerprint=key, defaults={"sql": entry["sql"], "last_seen": now}
+            )
+            row = SlowQuery.objects.select_for_update().get(fingerprint=key)
+            row.count += entry["count"]
+            row.total_ms += entry["total_ms"]
+            row.max_ms = max(row.max_ms, entry["max_ms"])
+            row.samples = (row.samples + entry["samples"])[-self.options["SAMPLE_SIZE"]:]
+            row.p95_ms = percentile(row.samples, 0.95)
+            for view, count in entry["views"].items():
+                row.views[view] = row.views.get(view, 0) + count
+            row.last_view = entry["last_view"]
+            row.last_seen = now
+
+            if entry["example"] and (
+                not row.explained_at or random.random() < self.options["EXPLAIN_SAMPLE_RATE"]
+            ):
+                plan = explain(*entry["example"])
+                if plan is not None:
+                    row.explain, row.explained_at = plan, now
+            row.save()
+
+    def shutdown(self, timeout=5.0):
+        if self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+        self.flush()
+
+
+def explain(alias, sql, params):
+    connection = connections[alias]
+    prefix = EXPLAIN_PREFIX.get(connection.vendor)
+    if prefix is None or not sql.lstrip().upper().startswith("SELECT"):
+        return None
+    try:
+        # Savepoint propio: si el EXPLAIN falla no rompe la transacción del volcado.
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            columns = [column[0] for column in cursor.description or ()]
+            rows = cursor.fetchall()
+    except Exception as exc:
+        return f"EXPLAIN falló: {exc}"
+    lines = ["\t".join(columns)] if columns else []
+    lines += ["\t".join("" if value is None else str(value) for value in row) for row in rows]
+    return "\n".join(lines)
+
+
+slow_query_log = SlowQueryLog(getattr(settings, "SLOW_QUERIES", None))
+atexit.register(slow_query_log.shutdown)
+
+
+def install_slow_query_wrapper(connection):
+    # connection_created se dispara en cada reconexión del mismo wrapper: no duplicar.
+    # Va al inicio de la lista porque la conexión puede abrirse dentro de un
+    # "with connection.execute_wrapper(...)", que al salir quita el último.
+    if slow_query_log.options["ENABLED"] and slow_query_log not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, slow_query_log)
+
+
+class SlowQueryMiddleware:
+    # Anota la vista resuelta para atribuirle sus consultas lentas.
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_view.set("")
+        try:
+            return self.get_response(request)
+        finally:
+            current_view.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current_view.set(view_name(view_func, request.method)[:VIEW_MAX_LENGTH])
@@ -0,0 +1,73 @@
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+
+
+# ======================================================
+# STORAGE DIRECCIONADO POR CONTENIDO
+# ======================================================
+# Cada archivo se guarda una sola vez bajo el sha256 de su contenido:
+# "cas/ab/cd/abcd...<64>.jpg". Una segunda subida idéntica (otro paquete,
+# otro slide) devuelve el mismo nombre sin volver a escribir en disco, y la
+# URL solo cambia si cambia el contenido, así que se puede cachear para siempre.
+# Como un blob puede estar referenciado por varias filas, delete() no borra
+# blobs: los huérfanos se limpian con manage.py prune_media.
+CAS_PREFIX = "cas"
+_EXTENSION = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+
+def is_content_addressed(name):
+    return bool(name) and name.replace("\\", "/").startswith(CAS_PREFIX + "/")
+
+
+def digest_from_name(name):
+    if not is_content_addressed(name):
+        return None
+    return posixpath.splitext(posixpath.basename(name))[0]
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def __init__(self, *args, allow_overwrite=True, **kwargs):
+        # Dos subidas simultáneas del mismo contenido escriben los mismos bytes.
+        super().__init__(*args, allow_overwrite=allow_overwrite, **kwargs)
+
+    def digest_name(self, name, content):
+        sha = hashlib.sha256()
+        if hasattr(content, "seek"):
+            content.seek(0)
+        for chunk in content.chunks():
+            sha.update(chunk)
+        if hasattr(content, "seek"):
+            content.seek(0)
+
+        digest = sha.hexdigest()
+        extension = os.path.splitext(name)[1].lower()
+        if not _EXTENSION.match(extension):
+            extension = ""
+        return f"{CAS_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+    def get_available_name(self, name, max_length=None):
+        # El nombre real se decide en _save() a partir del contenido.
+        return name
+
+    def _save(self, name, content):
+        name = self.digest_name(name, content)
+        try:
+            # Blob repetido: se renueva su fecha para que prune_media no lo tome
+            # por huérfano antes de que se guarde la fila que lo va a usar.
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return super()._save(name, content)
+        return name
+
+    def delete(self, name):
+        if is_content_addressed(name):
+            return
+        super().delete(name)
+
+    def purge(self, name):
+        # Borrado real de un blob; solo para prune_media.
+        super().delete(name)
@@ -1,3 +1,280 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import urlsplit
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rest_framework.test import APITestCase
+
+from .cache import get_versions
+from .models import Category, CartItem, Faq, Package, PackageDateCapacity, RequestProfile, Reservation
+
+
+def _relative(url):
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}"
+
+
+class TurismoAPITestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Selva")
+        cls.packages = [
+            Package.objects.create(
+                category=cls.category,
+                title=f"Paquete selva amazónica {index}",
+                slug=f"selva-{index}",
+                short_description="Caminatas por la selva" if index % 2 else "Navegación por ríos",
+                description="Lagos y comunidades nativas",
+                price_from=Decimal("100"),
+                duration_days=index % 3,
+                max_group=10,
+            )
+            for index in range(30)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, url):
+        """Sigue los enlaces next; devuelve (ids en orden, SQL ejecutado, última página)."""
+        ids, sql, page = [], [], None
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content[:300])
+            page = response.json()
+            ids += [item["id"] for item in page["results"]]
+            sql += [query["sql"] for query in queries.captured_queries]
+            url = page["next"] and _relative(page["next"])
+        return ids, sql, page
+
+
+# ======================================================
+# PAGINACIÓN POR CURSOR
+# ======================================================
+class KeysetPaginationTests(TurismoAPITestCase):
+    def assertNoOffset(self, sql):
+        self.assertFalse([query for query in sql if " OFFSET " in query.upper()])
+
+    def test_ties_on_first_column_are_walked_without_offset(self):
+        for ordering in ("duration_days", "-duration_days"):
+            with self.subTest(ordering=ordering):
+                ids, sql, _ = self.walk(f"/api/v1/packages/?ordering={ordering}&page_size=4")
+                expected = Package.objects.order_by(ordering, ordering.replace("duration_days", "id"))
+                self.assertEqual(ids, list(expected.values_list("id", flat=True)))
+                self.assertNoOffset(sql)
+
+    def test_meta_ordering_with_ties(self):
+        for index in range(25):
+            Faq.objects.create(question=f"Pregunta {index}", answer="Respuesta", order=index % 2)
+        ids, sql, _ = self.walk("/api/v1/faqs/?page_size=7")
+        self.assertEqual(ids, list(Faq.objects.order_by("order", "id").values_list("id", flat=True)))
+        self.assertNoOffset(sql)
+
+    def test_previous_links_walk_back(self):
+        ids, _, page = self.walk("/api/v1/packages/?page_size=7")
+        back = [item["id"] for item in page["results"]]
+        previous = page["previous"]
+        while previous:
+            page = self.client.get(_relative(previous)).json()
+            back = [item["id"] for item in page["results"]] + back
+            previous = page["previous"]
+        self.assertEqual(back, ids)
+
+    def test_ranked_search_second_page(self):
+        first = self.client.get("/api/v1/packages/?search=selva").json()
+        self.assertEqual(len(first["results"]), 12)
+        self.assertIsNotNone(first["next"])
+
+        response = self.client.get(_relative(first["next"]))
+        self.assertEqual(response.status_code, 200)
+        ids, _, _ = self.walk("/api/v1/packages/?search=selva")
+        self.assertEqual(sorted(ids), sorted(package.id for package in self.packages))
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_invalid_or_foreign_cursor_is_404(self):
+        self.assertEqual(self.client.get("/api/v1/packages/?cursor=zzz").status_code, 404)
+        page = self.client.get("/api/v1/packages/?ordering=duration_days&page_size=4").json()
+        foreign = _relative(page["next"]).replace("ordering=duration_days", "ordering=price_from")
+        self.assertEqual(self.client.get(foreign).status_code, 404)
+
+
+# ======================================================
+# CACHÉ Y GET CONDICIONAL
+# ======================================================
+class ResponseCacheTests(TurismoAPITestCase):
+    def test_unchanged_content_is_304(self):
+        first = self.client.get("/api/v1/faqs/")
+        self.assertEqual(first.status_code, 200)
+        again = self.client.get("/api/v1/faqs/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_version_moves_only_after_commit(self):
+        first = self.client.get("/api/v1/faqs/")
+        (version,) = get_versions([Faq])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            faq = Faq.objects.create(question="¿Nueva?", answer="Sí")
+            self.assertEqual(get_versions([Faq]), [version])
+        self.assertTrue(callbacks)
+        self.assertNotEqual(get_versions([Faq]), [version])
+
+        response = self.client.get("/api/v1/faqs/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(faq.id, [item["id"] for item in response.json()["results"]])
+
+
+# ======================================================
+# DISPONIBILIDAD
+# ======================================================
+class AvailabilityTests(TurismoAPITestCase):
+    def test_month_out_of_range_is_400(self):
+        url = f"/api/v1/packages/{self.packages[0].id}/availability/"
+        for month in ("0000-01", "10000-01", "2026-13", "2026-00", "abc", "2026"):
+            with self.subTest(month=month):
+                response = self.client.get(url, {"month": month})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"detail": "month debe tener el formato YYYY-MM"})
+
+    def test_last_supported_month(self):
+        response = self.client.get(f"/api/v1/packages/{self.packages[0].id}/availability/", {"month": "9999-12"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["days"]), 31)
+
+
+# ======================================================
+# CARRITO
+# ======================================================
+class CartActionTests(TurismoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.travel_date = timezone.localdate() + timedelta(days=30)
+        self.cart_id = self.new_cart()
+
+    def new_cart(self):
+        response = self.client.post("/api/v1/carts/", {"email": "cliente@ejemplo.com"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        return response.json()["id"]
+
+    def item(self, package, adults):
+        return {
+            "package_id": package.id, "full_name": "Cliente",
+            "travel_date": self.travel_date.isoformat(), "adults": adults,
+        }
+
+    def add_items(self, *items):
+        return self.client.post(f"/api/v1/carts/{self.cart_id}/add_items/", {"items": list(items)}, format="json")
+
+    def reserved(self, package):
+        return (
+            PackageDateCapacity.objects.filter(package=package, date=self.travel_date)
+            .values_list("reserved", flat=True).first()
+        ) or 0
+
+    def test_add_items_reserves_seats(self):
+        package = self.packages[0]
+        response = self.add_items(self.item(package, 3), self.item(package, 2))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.reserved(package), 5)
+
+    def test_overbooked_batch_is_409_and_rolls_back(self):
+        package, other = self.packages[0], self.packages[1]
+        self.assertEqual(self.add_items(self.item(package, 4)).status_code, 201)
+
+        response = self.add_items(self.item(other, 2), self.item(package, 4), self.item(package, 3))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["remaining"], 6)
+        self.assertEqual(self.reserved(package), 4)
+        self.assertEqual(self.reserved(other), 0)
+        self.assertEqual(CartItem.objects.filter(cart_id=self.cart_id).count(), 1)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_checkout_queries_do_not_grow_with_items(self):
+        counts = []
+        for size in (1, 4):
+            self.cart_id = self.new_cart()
+            self.add_items(*[self.item(package, 1) for package in self.packages[:size]])
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(f"/api/v1/carts/{self.cart_id}/simulate_payment/", {}, format="json")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["amount"], 100.0 * size)
+            counts.append(len(queries.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertFalse(Reservation.objects.exclude(status="CONFIRMADO").exists())
+
+    def test_simulate_payment_with_invalid_pk_is_404(self):
+        for pk in ("abc", "999999"):
+            with self.subTest(pk=pk):
+                response = self.client.post(f"/api/v1/carts/{pk}/simulate_payment/", {}, format="json")
+                self.assertEqual(response.status_code, 404)
+
+    def test_add_items_with_invalid_pk_is_404(self):
+        item = {"package_id": self.packages[0].id, "full_name": "Cliente", "adults": 1}
+        for pk in ("abc", "999999"):
+            with self.subTest(pk=pk):
+                response = self.client.post(f"/api/v1/carts/{pk}/add_items/", {"items": [item]}, format="json")
+                self.assertEqual(response.status_code, 404)
+
+
+# ======================================================
+# ARCHIVOS MULTIMEDIA
+# ======================================================
+class MediaServingTests(TurismoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        with open(os.path.join(media_root, "archivo.bin"), "wb") as fh:
+            fh.write(bytes(range(100)))
+        media_settings = override_settings(MEDIA_ROOT=media_root, MEDIA_SERVING={"ACCEL": None, "CHUNK_SIZE": 16})
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def test_range_is_206(self):
+        response = self.client.get("/media/archivo.bin", HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 10-19/100")
+        self.assertEqual(b"".join(response.streaming_content), bytes(range(10, 20)))
+
+    def test_unsatisfiable_range_is_416(self):
+        response = self.client.get("/media/archivo.bin", HTTP_RANGE="bytes=200-300")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */100")
+
+    def test_etag_revalidation_is_304(self):
+        first = self.client.get("/media/archivo.bin")
+        self.assertEqual(b"".join(first.streaming_content), bytes(range(100)))
+        again = self.client.get("/media/archivo.bin", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+
+# ======================================================
+# PERFILADO
+# ======================================================
+class ProfilingTests(TurismoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_superuser("perfil", "perfil@ejemplo.com", "x"))
+
+    def test_profiled_request(self):
+        response = self.client.get("/api/v1/faqs/", HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(RequestProfile.objects.filter(pk=response["X-Profile-Id"]).exists())
+
+    def test_busy_profiler_serves_request_unprofiled(self):
+        # Lo que hace cProfile cuando ya hay otro perfilador activo (Python >= 3.12).
+        with mock.patch("cProfile.Profile.enable", side_effect=ValueError("Another profiling tool is already active")):
+            response = self.client.get("/api/v1/faqs/", HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertFalse(RequestProfile.objects.exists())
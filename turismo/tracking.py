@@ -0,0 +1,145 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .models import PageView
+
+logger = logging.getLogger(__name__)
+
+
+# ======================================================
+# BUFFER DE VISITAS (INSERCIÓN POR LOTES)
+# ======================================================
+# track_pageview solo encola el evento; un hilo de fondo lo escribe con
+# bulk_create cuando se junta un lote (BATCH_SIZE) o pasa FLUSH_INTERVAL.
+# La cola es acotada: con POLICY="drop" se descarta el evento si está llena,
+# con POLICY="block" se espera hasta BLOCK_TIMEOUT antes de descartarlo.
+DEFAULTS = {
+    "ENABLED": True,
+    "MAX_SIZE": 10000,
+    "BATCH_SIZE": 500,
+    "FLUSH_INTERVAL": 2.0,
+    "POLICY": "drop",
+    "BLOCK_TIMEOUT": 0.05,
+}
+
+PATH_MAX_LENGTH = PageView._meta.get_field("path").max_length
+USER_AGENT_MAX_LENGTH = PageView._meta.get_field("user_agent").max_length
+
+
+class PageViewBuffer:
+    def __init__(self, options=None):
+        self.options = {**DEFAULTS, **(options or {})}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._counters = {"queued": 0, "flushed": 0, "dropped": 0, "failed": 0}
+        self._pid = None
+        self._start()
+
+    def _start(self):
+        # Tras un fork (gunicorn --preload) la cola y el hilo no se heredan.
+        self._pid = os.getpid()
+        self._queue = queue.Queue(maxsize=self.options["MAX_SIZE"])
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _ensure_running(self):
+        if self._pid != os.getpid():
+            self._start()
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="pageview-flusher", daemon=True)
+                    self._thread.start()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def enqueue(self, path, user_agent=None, ip=None):
+        event = PageView(
+            path=(path or "/")[:PATH_MAX_LENGTH],
+            user_agent=(user_agent or "")[:USER_AGENT_MAX_LENGTH] or None,
+            ip=ip or None,
+        )
+
+        if not self.options["ENABLED"]:
+            event.save()
+            self._count("flushed")
+            return True
+
+        self._ensure_running()
+        try:
+            if self.options["POLICY"] == "block":
+                self._queue.put(event, timeout=self.options["BLOCK_TIMEOUT"])
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            self._count("dropped")
+            return False
+
+        self._count("queued")
+        if self._queue.qsize() >= self.options["BATCH_SIZE"]:
+            self._wake.set()
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.options["FLUSH_INTERVAL"])
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    def _drain(self):
+        batch = []
+        while len(batch) < self.options["BATCH_SIZE"]:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self):
+        with self._flush_lock:
+            close_old_connections()
+            try:
+                while True:
+                    batch = self._drain()
+                    if not batch:
+                        break
+                    try:
+                        PageView.objects.bulk_create(batch)
+                    except Exception:
+                        logger.exception("No se pudo guardar un lote de %s visitas", len(batch))
+                        self._count("failed", len(batch))
+                    else:
+                        self._count("flushed", len(batch))
+            finally:
+                close_old_connections()
+
+    def shutdown(self, timeout=5.0):
+        if self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        counters["pending"] = self._queue.qsize() if self._pid == os.getpid() else 0
+        counters["capacity"] = self.options["MAX_SIZE"]
+        counters["policy"] = self.options["POLICY"]
+        return counters
+
+
+pageview_buffer = PageViewBuffer(getattr(settings, "PAGEVIEW_BUFFER", None))
+atexit.register(pageview_buffer.shutdown)
@@ -0,0 +1,99 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Max
+
+from rest_framework import serializers
+
+from .cache import bump_version
+from .derivatives import image_pipeline
+from .models import PackagePhoto
+
+logger = logging.getLogger(__name__)
+
+
+# ======================================================
+# SUBIDA MASIVA DE FOTOS DE PAQUETES
+# ======================================================
+# Cada archivo se valida, se le extraen los metadatos y se guarda en el storage
+# en un pool de hilos acotado; después todas las filas entran con un solo
+# bulk_create. bulk_create no dispara post_save, así que la versión de caché y
+# las variantes se disparan a mano.
+UPLOAD_WORKERS = 4
+MAX_PHOTOS_PER_REQUEST = 50
+
+
+def _store_photo(package, upload, order):
+    serializers.ImageField().to_internal_value(upload)
+    upload.seek(0)
+    photo = PackagePhoto(package=package, order=order)
+    photo.set_image_metadata(upload.read())
+    upload.seek(0)
+
+    field = PackagePhoto._meta.get_field("image")
+    name = field.generate_filename(photo, upload.name)
+    photo.image = field.storage.save(name, upload, max_length=field.max_length)
+    return photo
+
+
+def _error_detail(exc):
+    if isinstance(exc, DjangoValidationError):
+        return exc.messages[0]
+    if isinstance(exc, serializers.ValidationError):
+        detail = exc.detail
+        return str(detail[0] if isinstance(detail, list) else detail)
+    logger.exception("No se pudo guardar la foto subida", exc_info=exc)
+    return "No se pudo guardar el archivo"
+
+
+def store_package_photos(package, files, start_order=0):
+    """Devuelve (fotos creadas, errores [{"index", "file", "detail"}])."""
+    workers = max(1, min(UPLOAD_WORKERS, len(files)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="photo-upload") as executor:
+        futures = [
+            executor.submit(_store_photo, package, upload, start_order + index)
+            for index, upload in enumerate(files)
+        ]
+
+    stored, errors = [], []
+    for index, (upload, future) in enumerate(zip(files, futures)):
+        exc = future.exception()
+        if exc is None:
+            stored.append(future.result())
+        else:
+            errors.append({"index": index, "file": upload.name, "detail": _error_detail(exc)})
+
+    if not stored:
+        return [], errors
+
+    storage = PackagePhoto._meta.get_field("image").storage
+    names = [photo.image.name for photo in stored]
+    try:
+        with transaction.atomic():
+            last_id = PackagePhoto.objects.aggregate(last=Max("id"))["last"] or 0
+            PackagePhoto.objects.bulk_create(stored)
+    except Exception:
+        for name in names:
+            storage.delete(name)
+        raise
+
+    # MySQL no devuelve los ids en bulk_create. Con el storage por contenido dos
+    # filas pueden compartir archivo, así que se ubican por (orden, archivo)
+    # entre las filas del paquete insertadas después del último id previo.
+    if any(photo.pk is None for photo in stored):
+        orders = [photo.order for photo in stored]
+        inserted = {
+            (photo.order, photo.image.name): photo
+            for photo in PackagePhoto.objects.filter(
+                package=package, id__gt=last_id,
+                order__gte=min(orders), order__lte=max(orders), image__in=names,
+            ).order_by("id")
+        }
+        stored = [inserted[(photo.order, photo.image.name)] for photo in stored]
+
+    bump_version(PackagePhoto)
+    for photo in stored:
+        image_pipeline.schedule(photo)
+    return stored, errors
@@ -18,8 +18,10 @@ from .views import (
     ContactMessageViewSet,
     NewsletterSubscriberViewSet,
     CartViewSet,
+    landing_bootstrap,
     my_reservations_lookup,
     track_pageview,
+    pageview_buffer_stats,
     admin_dashboard,
 )
 
@@ -55,7 +57,9 @@ router.register("newsletter", NewsletterSubscriberViewSet, basename="newsletter"
 
 urlpatterns = [
     path("v1/", include(router.urls)),
+    path("v1/bootstrap/", landing_bootstrap, name="bootstrap"),
     path("v1/my-reservations/", my_reservations_lookup, name="my-reservations"),
     path("v1/track-pageview/", track_pageview, name="track-pageview"),
     path("v1/admin/dashboard/", admin_dashboard, name="admin-dashboard"),
+    path("v1/admin/tracking-stats/", pageview_buffer_stats, name="tracking-stats"),
 ]
@@ -1,21 +1,28 @@
 import secrets
 import uuid
+from datetime import date
 
-from django.db.models import Count, Sum
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, permission_classes, action
-from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.permissions import AllowAny, IsAdminUser, SAFE_METHODS
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import get_object_or_404
+from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import (
     SiteInfo, HeroSlide, Service, AboutBlock, ValueItem, TeamMember,
     Certification, KPI, Faq, Testimonial,
     Category, Package, Reservation,
-    ContactMessage, NewsletterSubscriber, PageView,
-    PackagePhoto, Cart, CartItem, Payment
+    ContactMessage, NewsletterSubscriber, PageViewMonthly,
+    PackagePhoto, PackageInclude, PackageItinerary, Cart, CartItem, Payment,
+    normalize_email, normalize_phone
 )
 
 from .serializers import (
@@ -23,16 +30,37 @@ from .serializers import (
     AboutBlockSerializer, ValueItemSerializer, TeamMemberSerializer,
     CertificationSerializer, KPISerializer, FaqSerializer,
     TestimonialSerializer, CategorySerializer, PackageSerializer,
+    PackageCardSerializer, parse_csv_param,
     ReservationSerializer, ContactMessageSerializer,
     NewsletterSubscriberSerializer, PackagePhotoSerializer,
-    CartSerializer, CartItemSerializer, PaymentSerializer
+    CartSerializer, CartItemSerializer, CartItemInputSerializer, PaymentSerializer
+)
+
+from .pagination import (
+    ContentPagination, CatalogPagination, AdminListPagination, LookupPagination
+)
+from .search import PackageSearchFilter
+from .availability import (
+    SeatsUnavailableMixin, PackageAvailabilityFilter,
+    reserve_seats, release_seats, month_availability
+)
+from .uploads import MAX_PHOTOS_PER_REQUEST, store_package_photos
+from .query_planning import (
+    plan_queryset, PackageSideloadMixin, wants_package_sideload, sideloaded_packages
+)
+from .tracking import pageview_buffer
+from .cache import (
+    VersionedCacheMixin, response_cache_key, get_cached_response,
+    cache_response, is_cacheable_request,
+    response_validators, not_modified_response, set_validators
 )
 
 # ======================================================
 # BASE: LECTURA PÚBLICA / ESCRITURA ADMIN
 # ======================================================
-class PublicReadAdminWrite(viewsets.ModelViewSet):
+class PublicReadAdminWrite(VersionedCacheMixin, viewsets.ModelViewSet):
     permission_classes = [AllowAny]
+    pagination_class = ContentPagination
 
     def get_permissions(self):
         if self.request.method in ("POST", "PUT", "PATCH", "DELETE"):
@@ -96,6 +124,50 @@ class TestimonialViewSet(PublicReadAdminWrite):
     serializer_class = TestimonialSerializer
 
 
+# ======================================================
+# LANDING: TODO EL CONTENIDO EN UNA SOLA RESPUESTA
+# ======================================================
+# Listados activos de la landing: (clave, modelo, serializer). Una consulta por
+# tabla; la respuesta completa se cachea con las versiones de todos los modelos.
+BOOTSTRAP_SECTIONS = (
+    ("hero_slides", HeroSlide, HeroSlideSerializer),
+    ("services", Service, ServiceSerializer),
+    ("about_blocks", AboutBlock, AboutBlockSerializer),
+    ("values", ValueItem, ValueItemSerializer),
+    ("team", TeamMember, TeamMemberSerializer),
+    ("certifications", Certification, CertificationSerializer),
+    ("kpis", KPI, KPISerializer),
+    ("faqs", Faq, FaqSerializer),
+    ("testimonials", Testimonial, TestimonialSerializer),
+)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def landing_bootstrap(request):
+    key = None
+    if is_cacheable_request(request):
+        models = [SiteInfo] + [model for _, model, _ in BOOTSTRAP_SECTIONS]
+        key = response_cache_key(request, "bootstrap", models)
+        etag, last_modified = response_validators(key, models)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        cached = get_cached_response(key)
+        if cached is not None:
+            return set_validators(cached, etag, last_modified)
+
+    context = {"request": request}
+    site = SiteInfo.objects.order_by("id").first()
+    data = {"site": SiteInfoSerializer(site, context=context).data if site else None}
+    for name, model, serializer_class in BOOTSTRAP_SECTIONS:
+        data[name] = serializer_class(model.objects.filter(is_active=True), many=True, context=context).data
+
+    if key:
+        return set_validators(cache_response(key, request, data), etag, last_modified)
+    return Response(data)
+
+
 # ======================================================
 # CATÁLOGO DE PAQUETES
 # ======================================================
@@ -105,26 +177,79 @@ class CategoryViewSet(PublicReadAdminWrite):
 
 
 class PackageViewSet(PublicReadAdminWrite):
-    queryset = (
-        Package.objects
-        .select_related("category")
-        .prefetch_related("photos", "includes", "itinerary")
-        .all()
-    )
+    queryset = Package.objects.all()
     serializer_class = PackageSerializer
+    pagination_class = CatalogPagination
+    cache_models = (Package, Category, PackagePhoto, PackageInclude, PackageItinerary)
 
+    filter_backends = [DjangoFilterBackend, PackageSearchFilter, PackageAvailabilityFilter, OrderingFilter]
     filterset_fields = ["category", "difficulty", "is_popular", "is_featured", "is_active"]
-    search_fields = ["title", "short_description", "description", "category__name"]
     ordering_fields = ["price_from", "created_at", "duration_days"]
-    ordering = ["-created_at"]
+    ordering = ["-created_at", "-id"]
 
     parser_classes = [MultiPartParser, FormParser]
 
+    def should_cache_response(self, request):
+        # Los cupos cambian con cada reserva sin tocar las versiones del catálogo.
+        if PackageAvailabilityFilter().is_active(request):
+            return False
+        return super().should_cache_response(request)
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return PackageCardSerializer
+        return PackageSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method in SAFE_METHODS:
+            params = self.request.query_params
+            kwargs.setdefault("fields", parse_csv_param(params.get("fields")))
+            if "expand" in params:
+                kwargs.setdefault("expand", parse_csv_param(params.get("expand")))
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "availability":
+            return queryset.only("id", "max_group")
+        if self.request.method not in SAFE_METHODS:
+            return queryset.select_related("category").prefetch_related("photos", "includes", "itinerary")
+
+        # Solo se consulta lo que el serializer va a devolver.
+        serializer = self.get_serializer()
+        queryset = plan_queryset(queryset, serializer)
+        if "description" not in serializer.fields:
+            queryset = queryset.defer("description")
+        return queryset
+
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx["request"] = self.request
         return ctx
 
+    @action(detail=True, methods=["get"])
+    def availability(self, request, pk=None):
+        package = self.get_object()
+
+        month = request.query_params.get("month")
+        if month:
+            try:
+                year, month = (int(part) for part in month.split("-"))
+                # date() rechaza meses fuera de 1..12 y años fuera de 1..9999.
+                date(year, month, 1)
+            except ValueError:
+                return Response({"detail": "month debe tener el formato YYYY-MM"}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            today = timezone.localdate()
+            year, month = today.year, today.month
+
+        return Response({
+            "package_id": package.id,
+            "month": f"{year:04d}-{month:02d}",
+            "max_group": package.max_group,
+            "days": month_availability(package, year, month),
+        })
+
     @action(detail=True, methods=["post"], permission_classes=[IsAdminUser])
     def add_photos(self, request, pk=None):
         package = self.get_object()
@@ -135,29 +260,51 @@ class PackageViewSet(PublicReadAdminWrite):
                 {"detail": "Envía 1 o más archivos en el campo 'photos' (form-data)."},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        if len(files) > MAX_PHOTOS_PER_REQUEST:
+            return Response(
+                {"detail": f"Máximo {MAX_PHOTOS_PER_REQUEST} fotos por solicitud"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        created = []
         start_order = int(request.data.get("start_order", 0))
-
-        for i, f in enumerate(files):
-            created.append(
-                PackagePhoto.objects.create(
-                    package=package,
-                    image=f,
-                    order=start_order + i
-                )
-            )
+        created, errors = store_package_photos(package, files, start_order)
 
         serializer = PackagePhotoSerializer(created, many=True, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(
+            {"created": serializer.data, "errors": errors},
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
 
 
 # ======================================================
 # RESERVAS
 # ======================================================
-class ReservationViewSet(viewsets.ModelViewSet):
-    queryset = Reservation.objects.select_related("package").all()
+class ReservationViewSet(SeatsUnavailableMixin, PackageSideloadMixin, viewsets.ModelViewSet):
+    queryset = Reservation.objects.all()
     serializer_class = ReservationSerializer
+    pagination_class = AdminListPagination
+
+    def get_queryset(self):
+        return plan_queryset(super().get_queryset(), self.get_serializer())
+
+    # Cada escritura mueve los asientos del libro de cupos en la misma transacción.
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            reservation = Reservation(public_code=secrets.token_hex(8), **serializer.validated_data)
+            reserve_seats([reservation])
+            serializer.save(public_code=reservation.public_code)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            previous = Reservation.objects.select_for_update().get(pk=serializer.instance.pk)
+            release_seats([previous])
+            reservation = serializer.save()
+            reserve_seats([reservation])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            release_seats([Reservation.objects.select_for_update().get(pk=instance.pk)])
+            instance.delete()
 
     def get_permissions(self):
         if self.action in ("list", "retrieve", "update", "partial_update", "destroy"):
@@ -182,37 +329,58 @@ def my_reservations_lookup(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    qs = Reservation.objects.select_related("package").filter(email__iexact=email)
+    # Usa el índice (email_normalized, phone_digits): igualdad por correo y el
+    # filtro de teléfono solo sobre las filas de ese correo.
+    sideload = wants_package_sideload(request)
+    context = {"request": request, "sideload_packages": sideload}
+    qs = plan_queryset(
+        Reservation.objects.filter(email_normalized=normalize_email(email)),
+        ReservationSerializer(context=context),
+    )
     if phone:
-        qs = qs.filter(phone__icontains=phone)
+        qs = qs.filter(phone_digits__contains=normalize_phone(phone) or phone)
 
-    return Response(ReservationSerializer(qs, many=True, context={"request": request}).data)
+    paginator = LookupPagination()
+    page = paginator.paginate_queryset(qs, request)
+    data = ReservationSerializer(page, many=True, context=context).data
+    response = paginator.get_paginated_response(data)
+    if sideload:
+        response.data["packages"] = sideloaded_packages(data, request)
+    return response
 
 
 # ======================================================
 # CARRITO / PAGO SIMULADO
 # ======================================================
-class CartViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Cart.objects
-        .prefetch_related("items__package", "items__reservation")
-        .all()
-    )
+# Equivalente en SQL de CartItem.line_total().
+LINE_TOTAL = ExpressionWrapper(
+    F("unit_price") * (F("adults") + F("children")),
+    output_field=DecimalField(max_digits=12, decimal_places=2),
+)
+
+MAX_ITEMS_PER_REQUEST = 20
+
+
+class CartViewSet(SeatsUnavailableMixin, PackageSideloadMixin, viewsets.ModelViewSet):
+    queryset = Cart.objects.all()
     serializer_class = CartSerializer
     permission_classes = [AllowAny]
+    pagination_class = AdminListPagination
+
+    def get_queryset(self):
+        # Items, paquetes y reservas en un número fijo de consultas.
+        return plan_queryset(super().get_queryset(), CartSerializer(context=self.get_serializer_context()))
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx["request"] = self.request
         return ctx
 
-    def _expire_if_needed(self, cart):
-        if cart.status == "ABIERTO" and cart.expires_at and timezone.now() > cart.expires_at:
-            cart.status = "EXPIRADO"
-            cart.save(update_fields=["status", "updated_at"])
-            Reservation.objects.filter(cart_item__cart=cart, status="PENDIENTE").update(status="CANCELADO")
-            return True
-        return False
+    def _cart_response(self, cart, status_code=status.HTTP_200_OK):
+        data = CartSerializer(cart, context=self.get_serializer_context()).data
+        if wants_package_sideload(self.request):
+            data["packages"] = sideloaded_packages(data, self.request)
+        return Response(data, status=status_code)
 
     @action(detail=False, methods=["get"])
     def by_email(self, request):
@@ -220,18 +388,15 @@ class CartViewSet(viewsets.ModelViewSet):
         if not email:
             return Response({"detail": "email es obligatorio"}, status=status.HTTP_400_BAD_REQUEST)
 
-        cart = (
-            Cart.objects
-            .prefetch_related("items__package", "items__reservation")
-            .filter(email__iexact=email)
-            .order_by("-created_at")
-            .first()
-        )
+        cart = self.get_queryset().filter(email__iexact=email).order_by("-created_at").first()
         if not cart:
             return Response({"detail": "No existe carrito para ese email"}, status=status.HTTP_404_NOT_FOUND)
 
-        self._expire_if_needed(cart)
-        return Response(CartSerializer(cart, context={"request": request}).data)
+        # El estado EXPIRADO lo escribe el barrido de fondo (manage.py expire_carts);
+        # mientras tanto se muestra sin escribir en la base.
+        if cart.is_expired:
+            cart.status = "EXPIRADO"
+        return self._cart_response(cart)
 
     @action(detail=True, methods=["post"], permission_classes=[AllowAny])
     def add_item(self, request, pk=None):
@@ -240,7 +405,7 @@ class CartViewSet(viewsets.ModelViewSet):
         if cart.status != "ABIERTO":
             return Response({"detail": "El carrito no está ABIERTO"}, status=status.HTTP_400_BAD_REQUEST)
 
-        if self._expire_if_needed(cart):
+        if cart.is_expired:
             return Response({"detail": "El carrito está EXPIRADO"}, status=status.HTTP_400_BAD_REQUEST)
 
         package_id = request.data.get("package_id")
@@ -249,7 +414,7 @@ class CartViewSet(viewsets.ModelViewSet):
         phone = request.data.get("phone") or cart.phone
         nationality = request.data.get("nationality") or cart.nationality
 
-        travel_date = request.data.get("travel_date")
+        travel_date = request.data.get("travel_date") or None
         adults = int(request.data.get("adults", 1))
         children = int(request.data.get("children", 0))
         notes = request.data.get("notes")
@@ -258,13 +423,20 @@ class CartViewSet(viewsets.ModelViewSet):
             return Response({"detail": "package_id es obligatorio"}, status=status.HTTP_400_BAD_REQUEST)
         if not full_name:
             return Response({"detail": "full_name es obligatorio"}, status=status.HTTP_400_BAD_REQUEST)
+        if travel_date is not None:
+            try:
+                travel_date = parse_date(str(travel_date))
+            except ValueError:
+                travel_date = None
+            if travel_date is None:
+                return Response({"detail": "travel_date debe tener el formato YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
             package = Package.objects.get(id=package_id)
         except Package.DoesNotExist:
             return Response({"detail": "Paquete no existe"}, status=status.HTTP_404_NOT_FOUND)
 
-        reservation = Reservation.objects.create(
+        reservation = Reservation(
             package=package,
             full_name=full_name,
             email=email,
@@ -280,464 +452,104 @@ class CartViewSet(viewsets.ModelViewSet):
             public_code=secrets.token_hex(8),
         )
 
-        item = CartItem.objects.create(
-            cart=cart,
-            package=package,
-            reservation=reservation,
-            travel_date=travel_date,
-            adults=adults,
-            children=children,
-            unit_price=package.price_from,
-            currency=package.currency,
-        )
+        with transaction.atomic():
+            reserve_seats([reservation])
+            reservation.save()
+            item = CartItem.objects.create(
+                cart=cart,
+                package=package,
+                reservation=reservation,
+                travel_date=travel_date,
+                adults=adults,
+                children=children,
+                unit_price=package.price_from,
+                currency=package.currency,
+            )
 
         return Response(CartItemSerializer(item, context={"request": request}).data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=["post"], permission_classes=[AllowAny])
-    def remove_item(self, request, pk=None):
-        cart = self.get_object()
-
-        if cart.status != "ABIERTO":
-            return Response({"detail": "El carrito no está ABIERTO"}, status=status.HTTP_400_BAD_REQUEST)
-
-        if self._expire_if_needed(cart):
-            return Response({"detail": "El carrito está EXPIRADO"}, status=status.HTTP_400_BAD_REQUEST)
-
-        item_id = request.data.get("item_id")
-        if not item_id:
-            return Response({"detail": "item_id es obligatorio"}, status=status.HTTP_400_BAD_REQUEST)
-
-        try:
-            item = CartItem.objects.select_related("reservation").get(id=item_id, cart=cart)
-        except CartItem.DoesNotExist:
-            return Response({"detail": "Item no existe en este carrito"}, status=status.HTTP_404_NOT_FOUND)
-
-        if item.reservation and item.reservation.status == "PENDIENTE":
-            item.reservation.status = "CANCELADO"
-            item.reservation.save(update_fields=["status", "updated_at"])
-
-        item.delete()
-        return Response({"ok": True})
-
-    @action(detail=True, methods=["post"], permission_classes=[AllowAny])
-    def simulate_payment(self, request, pk=None):
-        cart = self.get_object()
-
-        if cart.status != "ABIERTO":
-            return Response({"detail": "El carrito no está ABIERTO"}, status=status.HTTP_400_BAD_REQUEST)
-
-        if self._expire_if_needed(cart):
-            return Response({"detail": "El carrito está EXPIRADO"}, status=status.HTTP_400_BAD_REQUEST)
-
-        items = cart.items.select_related("reservation").all()
-        if not items.exists():
-            return Response({"detail": "El carrito no tiene items"}, status=status.HTTP_400_BAD_REQUEST)
-
-        total = sum(i.line_total() for i in items)
-
-        payment = Payment.objects.create(
-            cart=cart,
-            amount=total,
-            currency=items.first().currency if items.first() else "USD",
-            provider="SIMULADO",
-            status="APROBADO",
-            reference=str(uuid.uuid4()),
-        )
-
-        cart.status = "PAGADO"
-        cart.save(update_fields=["status", "updated_at"])
-
-        for i in items:
-            if i.reservation and i.reservation.status == "PENDIENTE":
-                i.reservation.status = "CONFIRMADO"
-                i.reservation.total_amount = i.line_total()
-                i.reservation.currency = i.currency
-                i.reservation.save(update_fields=["status", "total_amount", "currency", "updated_at"])
-
-        return Response({
-            "cart_id": cart.id,
-            "cart_status": cart.status,
-            "payment_reference": payment.reference,
-            "amount": float(total),
-            "currency": payment.currency,
-        })
-
-
-# ======================================================
-# CONTACTO / NEWSLETTER
-# ======================================================
-class ContactMessageViewSet(viewsets.ModelViewSet):
-    queryset = ContactMessage.objects.all()
-    serializer_class = ContactMessageSerializer
-
-    def get_permissions(self):
-        if self.request.method in ("GET", "PUT", "PATCH", "DELETE"):
-            return [IsAdminUser()]
-        return [AllowAny()]
-
-
-class NewsletterSubscriberViewSet(viewsets.ModelViewSet):
-    queryset = NewsletterSubscriber.objects.all()
-    serializer_class = NewsletterSubscriberSerializer
-
-    def get_permissions(self):
-        if self.request.method in ("GET", "PUT", "PATCH", "DELETE"):
-            return [IsAdminUser()]
-        return [AllowAny()]
-
-
-# ======================================================
-# TRACKING DE VISITAS
-# ======================================================
-@api_view(["POST"])
-@permission_classes([AllowAny])
-def track_pageview(request):
-    PageView.objects.create(
-        path=request.data.get("path", "/"),
-        user_agent=request.META.get("HTTP_USER_AGENT"),
-        ip=request.META.get("REMOTE_ADDR")
-    )
-    return Response({"ok": True})
-
-
-# ======================================================
-# DASHBOARD ADMINISTRATIVO
-# ======================================================
-@api_view(["GET"])
-@permission_classes([IsAdminUser])
-def admin_dashboard(request):
-    visits_total = PageView.objects.count()
-    reservations_total = Reservation.objects.count()
-
-    ingresos = Reservation.objects.filter(
-        status__in=["CONFIRMADO", "CONTACTADO"]
-    ).aggregate(
-        total=Sum("total_amount")
-    )["total"] or 0
-
-    tasa_conversion = 0
-    if visits_total > 0:
-        tasa_conversion = (reservations_total / visits_total) * 100
-
-    reservas_por_estado = (
-        Reservation.objects
-        .values("status")
-        .annotate(total=Count("id"))
-        .order_by()
-    )
-
-    visitas_mensuales = (
-        PageView.objects
-        .extra(select={"mes": "MONTH(created_at)"})
-        .values("mes")
-        .annotate(total=Count("id"))
-        .order_by("mes")
-    )
-
-    return Response({
-        "kpis": {
-            "visitas_totales": visits_total,
-            "reservas_totales": reservations_total,
-            "ingresos": float(ingresos),
-            "tasa_conversion": round(tasa_conversion, 2),
-        },
-        "reservas_por_estado": list(reservas_por_estado),
-        "visitas_mensuales": list(visitas_mensuales),
-    })
-import secrets
-import uuid
-
-from django.db.models import Count, Sum
-from django.utils import timezone
-
-from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes, action
-from rest_framework.permissions import AllowAny, IsAdminUser
-from rest_framework.response import Response
-from rest_framework.parsers import MultiPartParser, FormParser
-
-from .models import (
-    SiteInfo, HeroSlide, Service, AboutBlock, ValueItem, TeamMember,
-    Certification, KPI, Faq, Testimonial,
-    Category, Package, Reservation,
-    ContactMessage, NewsletterSubscriber, PageView,
-    PackagePhoto, Cart, CartItem, Payment
-)
-
-from .serializers import (
-    SiteInfoSerializer, HeroSlideSerializer, ServiceSerializer,
-    AboutBlockSerializer, ValueItemSerializer, TeamMemberSerializer,
-    CertificationSerializer, KPISerializer, FaqSerializer,
-    TestimonialSerializer, CategorySerializer, PackageSerializer,
-    ReservationSerializer, ContactMessageSerializer,
-    NewsletterSubscriberSerializer, PackagePhotoSerializer,
-    CartSerializer, CartItemSerializer, PaymentSerializer
-)
-
-# ======================================================
-# BASE: LECTURA PÚBLICA / ESCRITURA ADMIN
-# ======================================================
-class PublicReadAdminWrite(viewsets.ModelViewSet):
-    permission_classes = [AllowAny]
-
-    def get_permissions(self):
-        if self.request.method in ("POST", "PUT", "PATCH", "DELETE"):
-            return [IsAdminUser()]
-        return [AllowAny()]
-
-
-# ======================================================
-# CONFIGURACIÓN DEL SITIO
-# ======================================================
-class SiteInfoViewSet(PublicReadAdminWrite):
-    queryset = SiteInfo.objects.all()
-    serializer_class = SiteInfoSerializer
-
-
-class HeroSlideViewSet(PublicReadAdminWrite):
-    queryset = HeroSlide.objects.all()
-    serializer_class = HeroSlideSerializer
-
-
-class ServiceViewSet(PublicReadAdminWrite):
-    queryset = Service.objects.all()
-    serializer_class = ServiceSerializer
-
-
-# ======================================================
-# CONTENIDO INSTITUCIONAL
-# ======================================================
-class AboutBlockViewSet(PublicReadAdminWrite):
-    queryset = AboutBlock.objects.all()
-    serializer_class = AboutBlockSerializer
-
-
-class ValueItemViewSet(PublicReadAdminWrite):
-    queryset = ValueItem.objects.all()
-    serializer_class = ValueItemSerializer
-
-
-class TeamMemberViewSet(PublicReadAdminWrite):
-    queryset = TeamMember.objects.all()
-    serializer_class = TeamMemberSerializer
-
-
-class CertificationViewSet(PublicReadAdminWrite):
-    queryset = Certification.objects.all()
-    serializer_class = CertificationSerializer
-
-
-class KPIViewSet(PublicReadAdminWrite):
-    queryset = KPI.objects.all()
-    serializer_class = KPISerializer
-
-
-class FaqViewSet(PublicReadAdminWrite):
-    queryset = Faq.objects.all()
-    serializer_class = FaqSerializer
-
-
-class TestimonialViewSet(PublicReadAdminWrite):
-    queryset = Testimonial.objects.all()
-    serializer_class = TestimonialSerializer
-
-
-# ======================================================
-# CATÁLOGO DE PAQUETES
-# ======================================================
-class CategoryViewSet(PublicReadAdminWrite):
-    queryset = Category.objects.all()
-    serializer_class = CategorySerializer
-
-
-class PackageViewSet(PublicReadAdminWrite):
-    queryset = (
-        Package.objects
-        .select_related("category")
-        .prefetch_related("photos", "includes", "itinerary")
-        .all()
-    )
-    serializer_class = PackageSerializer
-
-    filterset_fields = ["category", "difficulty", "is_popular", "is_featured", "is_active"]
-    search_fields = ["title", "short_description", "description", "category__name"]
-    ordering_fields = ["price_from", "created_at", "duration_days"]
-    ordering = ["-created_at"]
-
-    parser_classes = [MultiPartParser, FormParser]
-
-    def get_serializer_context(self):
-        ctx = super().get_serializer_context()
-        ctx["request"] = self.request
-        return ctx
-
-    @action(detail=True, methods=["post"], permission_classes=[IsAdminUser])
-    def add_photos(self, request, pk=None):
-        package = self.get_object()
-
-        files = request.FILES.getlist("photos")
-        if not files:
+    def add_items(self, request, pk=None):
+        items_data = request.data.get("items")
+        if not isinstance(items_data, list) or not items_data:
+            return Response({"detail": "items debe ser una lista con al menos un item"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items_data) > MAX_ITEMS_PER_REQUEST:
             return Response(
-                {"detail": "Envía 1 o más archivos en el campo 'photos' (form-data)."},
+                {"detail": f"Máximo {MAX_ITEMS_PER_REQUEST} items por solicitud"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        created = []
-        start_order = int(request.data.get("start_order", 0))
+        serializer = CartItemInputSerializer(data=items_data, many=True)
+        serializer.is_valid(raise_exception=True)
+        rows = serializer.validated_data
 
-        for i, f in enumerate(files):
-            created.append(
-                PackagePhoto.objects.create(
-                    package=package,
-                    image=f,
-                    order=start_order + i
-                )
-            )
+        with transaction.atomic():
+            cart = get_object_or_404(Cart.objects.select_for_update(), pk=pk)
+            self.check_object_permissions(request, cart)
 
-        serializer = PackagePhotoSerializer(created, many=True, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+            if cart.status != "ABIERTO":
+                return Response({"detail": "El carrito no está ABIERTO"}, status=status.HTTP_400_BAD_REQUEST)
 
+            if cart.is_expired:
+                return Response({"detail": "El carrito está EXPIRADO"}, status=status.HTTP_400_BAD_REQUEST)
 
-# ======================================================
-# RESERVAS
-# ======================================================
-class ReservationViewSet(viewsets.ModelViewSet):
-    queryset = Reservation.objects.select_related("package").all()
-    serializer_class = ReservationSerializer
-
-    def get_permissions(self):
-        if self.action in ("list", "retrieve", "update", "partial_update", "destroy"):
-            return [IsAdminUser()]
-        return [AllowAny()]
-
-    def get_serializer_context(self):
-        ctx = super().get_serializer_context()
-        ctx["request"] = self.request
-        return ctx
-
-
-@api_view(["GET"])
-@permission_classes([AllowAny])
-def my_reservations_lookup(request):
-    email = request.query_params.get("email")
-    phone = request.query_params.get("phone")
-
-    if not email:
-        return Response(
-            {"detail": "El correo electrónico es obligatorio"},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-
-    qs = Reservation.objects.select_related("package").filter(email__iexact=email)
-    if phone:
-        qs = qs.filter(phone__icontains=phone)
-
-    return Response(ReservationSerializer(qs, many=True, context={"request": request}).data)
-
-
-# ======================================================
-# CARRITO / PAGO SIMULADO
-# ======================================================
-class CartViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Cart.objects
-        .prefetch_related("items__package", "items__reservation")
-        .all()
-    )
-    serializer_class = CartSerializer
-    permission_classes = [AllowAny]
-
-    def get_serializer_context(self):
-        ctx = super().get_serializer_context()
-        ctx["request"] = self.request
-        return ctx
-
-    def _expire_if_needed(self, cart):
-        if cart.status == "ABIERTO" and cart.expires_at and timezone.now() > cart.expires_at:
-            cart.status = "EXPIRADO"
-            cart.save(update_fields=["status", "updated_at"])
-            Reservation.objects.filter(cart_item__cart=cart, status="PENDIENTE").update(status="CANCELADO")
-            return True
-        return False
-
-    @action(detail=False, methods=["get"])
-    def by_email(self, request):
-        email = request.query_params.get("email")
-        if not email:
-            return Response({"detail": "email es obligatorio"}, status=status.HTTP_400_BAD_REQUEST)
-
-        cart = (
-            Cart.objects
-            .prefetch_related("items__package", "items__reservation")
-            .filter(email__iexact=email)
-            .order_by("-created_at")
-            .first()
-        )
-        if not cart:
-            return Response({"detail": "No existe carrito para ese email"}, status=status.HTTP_404_NOT_FOUND)
-
-        self._expire_if_needed(cart)
-        return Response(CartSerializer(cart, context={"request": request}).data)
-
-    @action(detail=True, methods=["post"], permission_classes=[AllowAny])
-    def add_item(self, request, pk=None):
-        cart = self.get_object()
-
-        if cart.status != "ABIERTO":
-            return Response({"detail": "El carrito no está ABIERTO"}, status=status.HTTP_400_BAD_REQUEST)
-
-        if self._expire_if_needed(cart):
-            return Response({"detail": "El carrito está EXPIRADO"}, status=status.HTTP_400_BAD_REQUEST)
-
-        package_id = request.data.get("package_id")
-        full_name = request.data.get("full_name")
-        email = request.data.get("email") or cart.email
-        phone = request.data.get("phone") or cart.phone
-        nationality = request.data.get("nationality") or cart.nationality
-
-        travel_date = request.data.get("travel_date")
-        adults = int(request.data.get("adults", 1))
-        children = int(request.data.get("children", 0))
-        notes = request.data.get("notes")
-
-        if not package_id:
-            return Response({"detail": "package_id es obligatorio"}, status=status.HTTP_400_BAD_REQUEST)
-        if not full_name:
-            return Response({"detail": "full_name es obligatorio"}, status=status.HTTP_400_BAD_REQUEST)
-
-        try:
-            package = Package.objects.get(id=package_id)
-        except Package.DoesNotExist:
-            return Response({"detail": "Paquete no existe"}, status=status.HTTP_404_NOT_FOUND)
-
-        reservation = Reservation.objects.create(
-            package=package,
-            full_name=full_name,
-            email=email,
-            phone=phone,
-            travel_date=travel_date,
-            adults=adults,
-            children=children,
-            nationality=nationality,
-            notes=notes,
-            status="PENDIENTE",
-            total_amount=None,
-            currency=package.currency,
-            public_code=secrets.token_hex(8),
-        )
+            packages = Package.objects.in_bulk({row["package_id"] for row in rows})
+            missing = sorted({row["package_id"] for row in rows} - set(packages))
+            if missing:
+                return Response(
+                    {"detail": "Paquete no existe", "package_ids": missing},
+                    status=status.HTTP_404_NOT_FOUND
+                )
 
-        item = CartItem.objects.create(
-            cart=cart,
-            package=package,
-            reservation=reservation,
-            travel_date=travel_date,
-            adults=adults,
-            children=children,
-            unit_price=package.price_from,
-            currency=package.currency,
-        )
+            reservations = [
+                Reservation(
+                    package=packages[row["package_id"]],
+                    full_name=row["full_name"],
+                    email=row.get("email") or cart.email,
+                    phone=row.get("phone") or cart.phone,
+                    nationality=row.get("nationality") or cart.nationality,
+                    travel_date=row.get("travel_date"),
+                    adults=row["adults"],
+                    children=row["children"],
+                    notes=row.get("notes"),
+                    status="PENDIENTE",
+                    total_amount=None,
+                    currency=packages[row["package_id"]].currency,
+                    public_code=secrets.token_hex(8),
+                )
+                for row in rows
+            ]
+            for reservation in reservations:
+                reservation.normalize_contact()
+            reserve_seats(reservations)
+            Reservation.objects.bulk_create(reservations)
+
+            # MySQL no devuelve los ids en bulk_create: se recuperan por código público.
+            if any(r.pk is None for r in reservations):
+                ids = dict(
+                    Reservation.objects
+                    .filter(public_code__in=[r.public_code for r in reservations])
+                    .values_list("public_code", "id")
+                )
+                for reservation in reservations:
+                    reservation.pk = ids[reservation.public_code]
+
+            CartItem.objects.bulk_create([
+                CartItem(
+                    cart=cart,
+                    package=reservation.package,
+                    reservation=reservation,
+                    travel_date=reservation.travel_date,
+                    adults=reservation.adults,
+                    children=reservation.children,
+                    unit_price=reservation.package.price_from,
+                    currency=reservation.package.currency,
+                )
+                for reservation in reservations
+            ])
 
-        return Response(CartItemSerializer(item, context={"request": request}).data, status=status.HTTP_201_CREATED)
+        cart = self.get_queryset().get(pk=cart.pk)
+        return self._cart_response(cart, status.HTTP_201_CREATED)
 
     @action(detail=True, methods=["post"], permission_classes=[AllowAny])
     def remove_item(self, request, pk=None):
@@ -746,7 +558,7 @@ class CartViewSet(viewsets.ModelViewSet):
         if cart.status != "ABIERTO":
             return Response({"detail": "El carrito no está ABIERTO"}, status=status.HTTP_400_BAD_REQUEST)
 
-        if self._expire_if_needed(cart):
+        if cart.is_expired:
             return Response({"detail": "El carrito está EXPIRADO"}, status=status.HTTP_400_BAD_REQUEST)
 
         item_id = request.data.get("item_id")
@@ -758,47 +570,55 @@ class CartViewSet(viewsets.ModelViewSet):
         except CartItem.DoesNotExist:
             return Response({"detail": "Item no existe en este carrito"}, status=status.HTTP_404_NOT_FOUND)
 
-        if item.reservation and item.reservation.status == "PENDIENTE":
-            item.reservation.status = "CANCELADO"
-            item.reservation.save(update_fields=["status", "updated_at"])
+        with transaction.atomic():
+            if item.reservation and item.reservation.status == "PENDIENTE":
+                release_seats([item.reservation])
+                item.reservation.status = "CANCELADO"
+                item.reservation.save(update_fields=["status", "updated_at"])
 
-        item.delete()
+            item.delete()
         return Response({"ok": True})
 
     @action(detail=True, methods=["post"], permission_classes=[AllowAny])
     def simulate_payment(self, request, pk=None):
-        cart = self.get_object()
-
-        if cart.status != "ABIERTO":
-            return Response({"detail": "El carrito no está ABIERTO"}, status=status.HTTP_400_BAD_REQUEST)
-
-        if self._expire_if_needed(cart):
-            return Response({"detail": "El carrito está EXPIRADO"}, status=status.HTTP_400_BAD_REQUEST)
-
-        items = cart.items.select_related("reservation").all()
-        if not items.exists():
-            return Response({"detail": "El carrito no tiene items"}, status=status.HTTP_400_BAD_REQUEST)
-
-        total = sum(i.line_total() for i in items)
-
-        payment = Payment.objects.create(
-            cart=cart,
-            amount=total,
-            currency=items.first().currency if items.first() else "USD",
-            provider="SIMULADO",
-            status="APROBADO",
-            reference=str(uuid.uuid4()),
-        )
+        # Todo el checkout en una transacción con el carrito bloqueado; el número
+        # de consultas no depende de cuántos items tenga el carrito.
+        with transaction.atomic():
+            cart = get_object_or_404(Cart.objects.select_for_update(), pk=pk)
+            self.check_object_permissions(request, cart)
+
+            if cart.status != "ABIERTO":
+                return Response({"detail": "El carrito no está ABIERTO"}, status=status.HTTP_400_BAD_REQUEST)
+
+            if cart.is_expired:
+                return Response({"detail": "El carrito está EXPIRADO"}, status=status.HTTP_400_BAD_REQUEST)
+
+            summary = cart.items.aggregate(total=Sum(LINE_TOTAL), items=Count("id"))
+            if not summary["items"]:
+                return Response({"detail": "El carrito no tiene items"}, status=status.HTTP_400_BAD_REQUEST)
+
+            total = summary["total"]
+            currency = cart.items.values_list("currency", flat=True).first() or "USD"
+
+            payment = Payment.objects.create(
+                cart=cart,
+                amount=total,
+                currency=currency,
+                provider="SIMULADO",
+                status="APROBADO",
+                reference=str(uuid.uuid4()),
+            )
 
-        cart.status = "PAGADO"
-        cart.save(update_fields=["status", "updated_at"])
+            cart.status = "PAGADO"
+            cart.save(update_fields=["status", "updated_at"])
 
-        for i in items:
-            if i.reservation and i.reservation.status == "PENDIENTE":
-                i.reservation.status = "CONFIRMADO"
-                i.reservation.total_amount = i.line_total()
-                i.reservation.currency = i.currency
-                i.reservation.save(update_fields=["status", "total_amount", "currency", "updated_at"])
+            item = CartItem.objects.filter(reservation_id=OuterRef("pk"))
+            Reservation.objects.filter(cart_item__cart=cart, status="PENDIENTE").update(
+                status="CONFIRMADO",
+                total_amount=Subquery(item.values(line_total=LINE_TOTAL)[:1]),
+                currency=Subquery(item.values("currency")[:1]),
+                updated_at=timezone.now(),
+            )
 
         return Response({
             "cart_id": cart.id,
@@ -815,6 +635,7 @@ class CartViewSet(viewsets.ModelViewSet):
 class ContactMessageViewSet(viewsets.ModelViewSet):
     queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
+    pagination_class = AdminListPagination
 
     def get_permissions(self):
         if self.request.method in ("GET", "PUT", "PATCH", "DELETE"):
@@ -825,6 +646,7 @@ class ContactMessageViewSet(viewsets.ModelViewSet):
 class NewsletterSubscriberViewSet(viewsets.ModelViewSet):
     queryset = NewsletterSubscriber.objects.all()
     serializer_class = NewsletterSubscriberSerializer
+    pagination_class = AdminListPagination
 
     def get_permissions(self):
         if self.request.method in ("GET", "PUT", "PATCH", "DELETE"):
@@ -838,7 +660,8 @@ class NewsletterSubscriberViewSet(viewsets.ModelViewSet):
 @api_view(["POST"])
 @permission_classes([AllowAny])
 def track_pageview(request):
-    PageView.objects.create(
+    # Se encola y se responde al instante; el INSERT va por lotes (tracking.py).
+    pageview_buffer.enqueue(
         path=request.data.get("path", "/"),
         user_agent=request.META.get("HTTP_USER_AGENT"),
         ip=request.META.get("REMOTE_ADDR")
@@ -846,13 +669,20 @@ def track_pageview(request):
     return Response({"ok": True})
 
 
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def pageview_buffer_stats(request):
+    return Response(pageview_buffer.stats())
+
+
 # ======================================================
 # DASHBOARD ADMINISTRATIVO
 # ======================================================
 @api_view(["GET"])
 @permission_classes([IsAdminUser])
 def admin_dashboard(request):
-    visits_total = PageView.objects.count()
+    # Las visitas salen de los agregados (rollup_pageviews), no de la tabla cruda.
+    visits_total = PageViewMonthly.objects.aggregate(total=Sum("total"))["total"] or 0
     reservations_total = Reservation.objects.count()
 
     ingresos = Reservation.objects.filter(
@@ -872,13 +702,15 @@ def admin_dashboard(request):
         .order_by()
     )
 
-    visitas_mensuales = (
-        PageView.objects
-        .extra(select={"mes": "MONTH(created_at)"})
-        .values("mes")
-        .annotate(total=Count("id"))
-        .order_by("mes")
-    )
+    visitas_mensuales = [
+        {"anio": row["year"], "mes": row["month"], "total": row["visits"]}
+        for row in (
+            PageViewMonthly.objects
+            .values("year", "month")
+            .annotate(visits=Sum("total"))
+            .order_by("year", "month")
+        )
+    ]
 
     return Response({
         "kpis": {
@@ -888,5 +720,5 @@ def admin_dashboard(request):
             "tasa_conversion": round(tasa_conversion, 2),
         },
         "reservas_por_estado": list(reservas_por_estado),
-        "visitas_mensuales": list(visitas_mensuales),
+        "visitas_mensuales": visitas_mensuales,
     })